@@ -22,11 +22,15 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 
-# Add src to python path for imports
-sys.path.append(str(Path(__file__).resolve().parent / "src"))
+# Add python_src to python path so the canonical parsers module is imported
+sys.path.append(str(Path(__file__).resolve().parent / "python_src"))
 
 from parsers import parse_whatsapp
 
+# Single-pass escape table for message content: newlines become literal
+# "\n", tabs become spaces (tab is the field separator).
+_CONTENT_ESCAPE = str.maketrans({'\n': '\\n', '\t': ' '})
+
 
 def compress_chat(input_path: Path, output_path: Path):
     """
@@ -41,13 +45,12 @@ def compress_chat(input_path: Path, output_path: Path):
 
     print(f"Parsed {len(messages)} messages.")
 
-    # Build sender index
-    senders = []
+    # Build sender index (setdefault is a single dict op per message;
+    # insertion order gives us the sender list for free)
     sender_map = {}
     for msg in messages:
-        if msg.sender not in sender_map:
-            sender_map[msg.sender] = len(senders)
-            senders.append(msg.sender)
+        sender_map.setdefault(msg.sender, len(sender_map))
+    senders = list(sender_map)
 
     # Create metadata line
     metadata = {
@@ -56,34 +59,48 @@ def compress_chat(input_path: Path, output_path: Path):
         "format": "YY-MM<tab>SenderIdx<tab>Content"
     }
 
-    # Build output lines
-    output_lines = [json.dumps(metadata, separators=(',', ':'), ensure_ascii=False)]
-
-    for msg in messages:
-        # Timestamp: YY-MM (e.g., "23-09" for September 2023)
-        ts_compact = msg.timestamp.strftime("%y-%m")
-        
-        # Sender index
-        s_idx = sender_map[msg.sender]
-        
-        # Content: escape newlines for the format
-        content = msg.content.replace('\n', '\\n').replace('\t', ' ')
-        
-        # Tab-separated line
-        line = f"{ts_compact}\t{s_idx}\t{content}"
-        output_lines.append(line)
-
-    # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(output_lines))
+    # strftime is slow and year-month pairs repeat across thousands of
+    # messages, so format each unique (year, month) only once.
+    ym_cache = {}
+
+    def _ym(ts):
+        key = (ts.year, ts.month)
+        compact = ym_cache.get(key)
+        if compact is None:
+            compact = ts.strftime("%y-%m")
+            ym_cache[key] = compact
+        return compact
+
+    # Columnar pass: pull each field out of the message objects into three
+    # parallel lists up front, so the write loop below iterates aligned
+    # arrays instead of chasing .timestamp/.sender/.content attributes per
+    # record.
+    timestamps = [_ym(m.timestamp) for m in messages]
+    sender_idxs = [sender_map[m.sender] for m in messages]
+    contents = [m.content.translate(_CONTENT_ESCAPE) for m in messages]
+
+    # Stream lines straight to a large-buffered file handle instead of
+    # accumulating them in a list and joining - avoids holding the whole
+    # output (list + joined string) in memory at once.
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        metadata_line = json.dumps(metadata, separators=(',', ':'), ensure_ascii=False)
+        f.write(metadata_line)
+
+        # Track the output size in the same pass as the writes instead of
+        # re-traversing the data (or the file) afterwards.
+        new_size = len(metadata_line)
+        for ts_compact, s_idx, content in zip(timestamps, sender_idxs, contents):
+            # Tab-separated line: YY-MM\tSenderIdx\tContent
+            line = f"\n{ts_compact}\t{s_idx}\t{content}"
+            new_size += len(line)
+            f.write(line)
 
     # Calculate compression stats
     original_size_approx = sum(len(m.content) + 30 for m in messages)  # Approx original overhead
-    new_size = sum(len(line) for line in output_lines)
-    
+
     print(f"Output written to: {output_path}")
     print(f"Estimated original token size: ~{original_size_approx:,}")
-    print(f"New compressed size: ~{new_size:,} characters")
+    print(f"New compressed size: ~{new_size:,} chars")
     print(f"Compression ratio: ~{original_size_approx / new_size:.2f}x")
 
 
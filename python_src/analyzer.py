@@ -2,11 +2,35 @@ import os
 import time
 import json
 import logging
-from typing import List, Dict
-import google.generativeai as genai
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from functools import cache
+from typing import Callable, List, Dict, Optional
+from google import genai
 from config import GEMINI_ACCOUNT_KEYS
 from models import UnifiedMessage, AnalysisProfile
 
+# orjson parses/serializes JSON several times faster than the stdlib; fall
+# back to stdlib json when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(text):
+    """Parses a JSON string with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _json_dumps_pretty(obj) -> str:
+    """Serializes `obj` to indented JSON (non-ASCII kept as-is)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,13 +39,36 @@ class KeyManager:
     """
     Manages multiple Google Accounts, each with a list of API Key(s).
     Structure: [ [Acc1_K1, Acc1_K2], [Acc2_K1], ... ]
+
+    Thread-safe: analysis workers call get_active_key() / mark_key_exhausted()
+    concurrently, so all mutable rotation state is guarded by a single lock.
     """
     def __init__(self, account_keys: List[List[str]]):
         self.account_keys = [keys for keys in account_keys if keys] # Filter empty lists
-        self.current_acc_idx = 0
-        self.current_key_indices = [0] * len(self.account_keys)
-        self.account_cooldowns: Dict[int, float] = {} # acc_idx -> timestamp available
         self.cooldown_duration = 90 # 1.5 Minutes as requested
+        # Health is tracked per key, not per account: one key hitting 429
+        # must not bench its account's remaining healthy keys.
+        # Keys are identified by (acc_idx, key_idx).
+        self.key_cooldowns: Dict[tuple, float] = {} # key id -> timestamp available
+        self.key_dead: set = set() # key ids permanently disabled (auth failures)
+        self._all_keys: List[tuple] = [
+            ((acc_idx, key_idx), key)
+            for acc_idx, keys in enumerate(self.account_keys)
+            for key_idx, key in enumerate(keys)
+        ]
+        self._key_to_id: Dict[str, tuple] = {
+            key: key_id for key_id, key in self._all_keys
+        }
+        # Least-used selection state: per-key request counts over a rolling
+        # window (approximates per-key RPM fairness) with LRU tiebreak.
+        self.request_counts: Dict[tuple, int] = {}
+        self.last_used: Dict[tuple, float] = {}
+        self._window_start = time.time()
+        self._window_duration = 60.0
+        # One Client per key, created lazily and reused so TCP/TLS sessions
+        # persist across calls instead of being re-established every request.
+        self._clients: Dict[str, genai.Client] = {}
+        self._lock = threading.Lock()
 
     def get_active_key(self) -> str:
         """
@@ -30,46 +77,95 @@ class KeyManager:
         if not self.account_keys:
             raise ValueError("No API keys provided in config.")
 
-        start_idx = self.current_acc_idx
-        
-        # 1. Try to find an account not in cooldown
-        for _ in range(len(self.account_keys)):
-            acc_idx = self.current_acc_idx
-            
-            if acc_idx not in self.account_cooldowns or time.time() > self.account_cooldowns[acc_idx]:
-                # Found available account, get its current key
-                key_idx = self.current_key_indices[acc_idx]
-                keys = self.account_keys[acc_idx]
-                
-                # Rotate key index for this account for next time (Round Robin)
-                self.current_key_indices[acc_idx] += 1
-                
-                return keys[key_idx % len(keys)]
-            
-            # Try next account
-            self.current_acc_idx = (self.current_acc_idx + 1) % len(self.account_keys)
-
-        # 2. If all accounts cooling down, wait for the soonest
-        earliest_time = min(self.account_cooldowns.values())
-        wait_time = earliest_time - time.time()
-        
-        if wait_time > 0:
-            logger.warning(f"All Accounts are in cooldown / quota limit. Waiting {wait_time:.1f}s...")
-            time.sleep(wait_time + 1)
-        
-        return self.get_active_key()
-
-    def mark_current_account_exhausted(self):
+        while True:
+            with self._lock:
+                now = time.time()
+
+                # Reset usage counts each window so "least used" tracks the
+                # current minute rather than the whole run.
+                if now - self._window_start > self._window_duration:
+                    self.request_counts.clear()
+                    self._window_start = now
+
+                # 1. Collect live keys, then pick the least-used one (LRU as
+                # tiebreak) so fresh keys absorb load before busy ones.
+                cooling = []
+                best = None
+                best_rank = None
+                for key_id, key in self._all_keys:
+                    if key_id in self.key_dead:
+                        continue
+
+                    available_at = self.key_cooldowns.get(key_id)
+                    if available_at is not None and now <= available_at:
+                        cooling.append(available_at)
+                        continue
+
+                    rank = (
+                        self.request_counts.get(key_id, 0),
+                        self.last_used.get(key_id, 0.0)
+                    )
+                    if best_rank is None or rank < best_rank:
+                        best, best_rank = (key_id, key), rank
+
+                if best is not None:
+                    key_id, key = best
+                    self.request_counts[key_id] = self.request_counts.get(key_id, 0) + 1
+                    self.last_used[key_id] = now
+                    return key
+
+                if not cooling:
+                    raise ValueError("All API keys are permanently disabled (auth failures).")
+
+                # 2. Every live key is cooling down: note the nearest absolute
+                # wake-up time, then re-scan. Recomputed each iteration so a
+                # cooldown that expired while we slept is picked up at once
+                # instead of over-waiting.
+                next_available = min(cooling)
+
+            # Sleep *outside* the lock so workers marking cooldowns are not blocked
+            wait_time = next_available - time.time()
+
+            if wait_time > 0:
+                logger.warning(f"All API keys are in cooldown / quota limit. Waiting {wait_time:.1f}s...")
+                time.sleep(wait_time + 0.1)
+
+    def get_client(self, api_key: str) -> "genai.Client":
         """
-        Call this when 429 is received. Marks the *entire account* as exhausted/cooldown.
+        Returns the cached Client for `api_key`, creating it on first use.
         """
-        acc_idx = self.current_acc_idx
-        logger.warning(f"Account {acc_idx} hit rate/quota limit. Switching account...")
-        
-        self.account_cooldowns[acc_idx] = time.time() + self.cooldown_duration
-        
-        # Switch to next account immediately
-        self.current_acc_idx = (self.current_acc_idx + 1) % len(self.account_keys)
+        client = self._clients.get(api_key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(api_key)
+                if client is None:
+                    client = genai.Client(api_key=api_key)
+                    self._clients[api_key] = client
+        return client
+
+    def mark_key_exhausted(self, api_key: str):
+        """
+        Call this when 429 is received. Cooldowns only the key that hit the
+        limit; the account's other keys stay in rotation.
+        """
+        with self._lock:
+            key_id = self._key_to_id.get(api_key)
+            if key_id is None:
+                return
+            logger.warning(f"Key {key_id} hit rate/quota limit. Cooling it down...")
+            self.key_cooldowns[key_id] = time.time() + self.cooldown_duration
+
+    def mark_key_dead(self, api_key: str):
+        """
+        Call this on permanent failures (401/403 auth errors). The key is
+        removed from rotation for the rest of the run.
+        """
+        with self._lock:
+            key_id = self._key_to_id.get(api_key)
+            if key_id is None:
+                return
+            logger.error(f"Key {key_id} failed auth. Disabling it permanently.")
+            self.key_dead.add(key_id)
 
 # Initialize Manager
 try:
@@ -84,17 +180,11 @@ def chunk_messages(messages: List[UnifiedMessage], chunk_size: int = 50) -> List
     """
     return [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
 
-def analyze_chunk(chunk_id: int, messages: List[UnifiedMessage]) -> Dict:
-    """
-    Sends a chunk of messages to Gemini Flash for interest extraction.
-    """
-    if not GEMINI_ACCOUNT_KEYS:
-        logger.error("Gemini API Keys are missing.")
-        return {}
-
+@cache
 def get_analysis_system_instruction() -> str:
     """
-    Returns the static system instruction for the analysis.
+    Returns the static system instruction for the analysis. Cached: the
+    string is constant, so per-chunk callers get the same object back.
     """
     return """
     You are an expert behavioral analyst and gift consultant.
@@ -133,17 +223,44 @@ def get_analysis_system_instruction() -> str:
     }
     """
 
+def get_packed_analysis_system_instruction() -> str:
+    """
+    Returns the system instruction for analyzing several packed chunks at once.
+    """
+    base = get_analysis_system_instruction()
+    return base + """
+    **BATCH MODE**:
+    The transcript below contains MULTIPLE independent chunks, each preceded
+    by a delimiter line "=== CHUNK <id> ===".
+    Analyze each chunk separately and return JSON ONLY of the form:
+    {
+        "results": [
+            { "chunk_id": <id>, ...the fields described above... },
+            ...
+        ]
+    }
+    Include one entry per chunk, in any order, with its "chunk_id".
+    """
+
+def construct_transcript(messages: List[UnifiedMessage]) -> str:
+    """
+    Formats a chunk of messages as a plain-text transcript.
+    """
+    # join is linear; += reallocates the growing transcript on every message
+    return "".join(
+        f"[{msg.timestamp.strftime('%Y-%m-%d %H:%M')}] {msg.sender}: {msg.content}\n"
+        for msg in messages
+    )
+
 def construct_analysis_prompt(messages: List[UnifiedMessage]) -> str:
     """
     Constructs the prompt string for the analysis.
     """
     # Format transcript for the prompt
-    transcript = ""
-    for msg in messages:
-        transcript += f"[{msg.timestamp.strftime('%Y-%m-%d %H:%M')}] {msg.sender}: {msg.content}\n"
+    transcript = construct_transcript(messages)
 
     system_instruction = get_analysis_system_instruction()
-    
+
     prompt = f"""
     {system_instruction}
 
@@ -151,7 +268,108 @@ def construct_analysis_prompt(messages: List[UnifiedMessage]) -> str:
     {transcript}
     """
     return prompt
-    return prompt
+
+# Token budget per packed request. We estimate 1 char = 1 token (same
+# conservative bound as optimization.estimate_tokens) so we never overflow.
+PACK_TARGET_TOKENS = 8000
+
+def pack_chunks(
+    indexed_chunks: List,
+    target_tokens: int = PACK_TARGET_TOKENS
+) -> List[List]:
+    """
+    Groups (chunk_id, messages) pairs into packs whose combined transcript
+    stays under `target_tokens`, so one HTTP round trip covers several
+    chunks. Short chats are dominated by fixed per-request latency, so
+    packing cuts request count roughly by the pack factor.
+    """
+    packs = []
+    current_pack = []
+    current_tokens = 0
+
+    for chunk_id, messages in indexed_chunks:
+        transcript = construct_transcript(messages)
+        chunk_tokens = len(transcript)
+
+        if current_pack and current_tokens + chunk_tokens > target_tokens:
+            packs.append(current_pack)
+            current_pack = []
+            current_tokens = 0
+
+        current_pack.append((chunk_id, transcript))
+        current_tokens += chunk_tokens
+
+    if current_pack:
+        packs.append(current_pack)
+
+    return packs
+
+def analyze_pack(pack: List) -> Dict[int, Dict]:
+    """
+    Sends one packed request of several (chunk_id, transcript) pairs and
+    returns a mapping of chunk_id -> analysis dict. Missing entries map to {}.
+    """
+    if not GEMINI_ACCOUNT_KEYS:
+        logger.error("Gemini API Keys are missing.")
+        return {chunk_id: {} for chunk_id, _ in pack}
+
+    system_instruction = get_packed_analysis_system_instruction()
+    body = "\n".join(
+        f"=== CHUNK {chunk_id} ===\n{transcript}" for chunk_id, transcript in pack
+    )
+    prompt = f"""
+    {system_instruction}
+
+    TRANSCRIPT:
+    {body}
+    """
+
+    pack_ids = [chunk_id for chunk_id, _ in pack]
+    results = {chunk_id: {} for chunk_id in pack_ids}
+
+    max_retries = 10 # Higher retries for rotation
+
+    for attempt in range(max_retries):
+        api_key = None
+        try:
+            if not key_manager:
+                return results
+            api_key = key_manager.get_active_key()
+
+            client = key_manager.get_client(api_key)
+            response = client.models.generate_content(
+                model='gemini-3-flash-preview',
+                contents=prompt,
+                config={"response_mime_type": "application/json"}
+            )
+            data = _json_loads(response.text)
+
+            entries = data.get("results", []) if isinstance(data, dict) else []
+            for position, entry in enumerate(entries):
+                if not isinstance(entry, dict):
+                    continue
+                # Trust the echoed chunk_id; fall back to positional order.
+                chunk_id = entry.pop("chunk_id", None)
+                if chunk_id not in results:
+                    if position < len(pack_ids):
+                        chunk_id = pack_ids[position]
+                    else:
+                        continue
+                results[chunk_id] = entry
+            return results
+
+        except Exception as e:
+            error_str = str(e)
+            if "429" in error_str and api_key:
+                key_manager.mark_key_exhausted(api_key)
+            elif api_key and ("401" in error_str or "403" in error_str or "API key not valid" in error_str):
+                key_manager.mark_key_dead(api_key)
+            else:
+                logger.error(f"Error analyzing pack {pack_ids}: {e}")
+                return results
+
+    logger.error(f"Failed to analyze pack {pack_ids} after {max_retries} attempts.")
+    return results
 
 def analyze_chunk(chunk_id: int, messages: List[UnifiedMessage]) -> Dict:
     """
@@ -162,84 +380,184 @@ def analyze_chunk(chunk_id: int, messages: List[UnifiedMessage]) -> Dict:
         return {}
 
     prompt = construct_analysis_prompt(messages)
-    
+
     max_retries = 10 # Higher retries for rotation
-    
+
     for attempt in range(max_retries):
+        api_key = None
         try:
             # 1. Get a valid key from active account
             if not key_manager:
                  return {}
             api_key = key_manager.get_active_key()
-            genai.configure(api_key=api_key)
-            
+
             # 2. Make Request
-            # Small delay to respect 5 RPM (Requests Per Minute) per account roughly if loop is tight
-            # If we switch accounts, we are fresh.
-            time.sleep(1) 
-
-            model = genai.GenerativeModel('gemini-3-flash-preview')
-            response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-            return json.loads(response.text)
-            
+            # The Client is bound to the key this worker pulled (no global SDK
+            # state) and cached, so connection pools are reused across calls.
+            client = key_manager.get_client(api_key)
+            response = client.models.generate_content(
+                model='gemini-3-flash-preview',
+                contents=prompt,
+                config={"response_mime_type": "application/json"}
+            )
+            return _json_loads(response.text)
+
         except Exception as e:
             error_str = str(e)
-            if "429" in error_str:
-                # 429 means THIS ACCOUNT is exhausted (limit per project)
-                key_manager.mark_current_account_exhausted()
+            if "429" in error_str and api_key:
+                # Rate/quota limit: bench just this key and retry on another
+                key_manager.mark_key_exhausted(api_key)
+            elif api_key and ("401" in error_str or "403" in error_str or "API key not valid" in error_str):
+                # Auth failure is permanent for this key
+                key_manager.mark_key_dead(api_key)
             else:
                 logger.error(f"Error analyzing chunk {chunk_id}: {e}")
                 return {}
-    
+
     logger.error(f"Failed to analyze chunk {chunk_id} after {max_retries} attempts.")
     return {}
 
-def aggregate_profiles(chunk_results: List[Dict]) -> AnalysisProfile:
+def analyze_chunks(
+    chunks: List[List[UnifiedMessage]],
+    start_index: int = 0,
+    on_result: Optional[Callable[[int, Dict], None]] = None,
+    max_workers: Optional[int] = None
+) -> List[Dict]:
     """
-    Merges multiple extraction results into a single profile.
-    This simple aggregation just concatenates lists; a smarter version could dedup or summarize again.
-    """
-    aggregated = {
-        "explicit_interests": set(),
-        "implicit_interests": set(),
-        "gift_mentions": set(),
-        "dislikes": set(),
-        "topics_discussed": set(), # Using key_dates as topics or similar
-        "relationship_dynamics": set(),
-        "inside_jokes": set(),
-        "closeness_indicators": set(),
-        "sentiment_trend": set()
-    }
+    Analyzes chunks concurrently, keeping one request in flight per API key.
+
+    The analysis phase is network-bound, so wall-clock time scales with how
+    many keys we keep busy simultaneously rather than with chunk count.
+    `on_result(index, result)` is invoked from the calling thread as each
+    chunk completes (possibly out of order), e.g. for checkpointing.
+    """
+    if not chunks or start_index >= len(chunks):
+        return []
 
-    def safe_update(target_set, items):
+    if max_workers is None:
+        # One in-flight request per key across all accounts
+        max_workers = max(1, sum(len(keys) for keys in GEMINI_ACCOUNT_KEYS))
+
+    results: List[Dict] = [{} for _ in chunks]
+
+    # Pack several small chunks per request so per-call latency is amortized.
+    packs = pack_chunks(
+        [(i, chunks[i]) for i in range(start_index, len(chunks))]
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(analyze_pack, pack): pack for pack in packs}
+        for future in as_completed(futures):
+            pack = futures[future]
+            try:
+                pack_results = future.result()
+            except Exception as e:
+                logger.error(f"Worker for pack {[cid for cid, _ in pack]} failed: {e}")
+                pack_results = {chunk_id: {} for chunk_id, _ in pack}
+            for chunk_id, result in pack_results.items():
+                results[chunk_id] = result or {}
+                if on_result:
+                    on_result(chunk_id, result or {})
+
+    return results[start_index:]
+
+def _freeze(value):
+    """
+    Recursively converts dicts/lists into hashable tuples so structured
+    items can be deduplicated without serializing them to JSON strings.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted(
+            ((k, _freeze(v)) for k, v in value.items()),
+            key=lambda kv: str(kv[0])
+        ))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+# Source field in chunk results -> bucket name in the aggregated profile.
+_AGGREGATE_FIELDS = (
+    ("explicit_interests", "explicit_interests"),
+    ("implicit_interests", "implicit_interests"),
+    ("gift_mentions", "gift_mentions"),
+    ("dislikes", "dislikes"),
+    ("key_dates", "topics_discussed"), # Using key_dates as topics or similar
+    ("relationship_dynamics", "relationship_dynamics"),
+    ("inside_jokes", "inside_jokes"),
+    ("closeness_indicators", "closeness_indicators"),
+    ("sentiment_trend", "sentiment_trend"),
+)
+
+# Below this many chunk results, worker startup and pickling cost more
+# than the aggregation itself.
+_PARALLEL_MIN_CHUNKS = 512
+
+def _aggregate_partition(chunk_results: List[Dict]) -> Dict[str, Dict]:
+    """
+    Aggregates a slice of chunk results into dedup buckets. Each bucket
+    maps a hashable dedup key -> the original item, so complex objects
+    survive aggregation intact instead of as JSON strings. Top-level and
+    pure so partitions can be mapped across processes.
+    """
+    aggregated = {bucket: {} for _, bucket in _AGGREGATE_FIELDS}
+
+    def safe_update(target, items):
         for item in items:
             if isinstance(item, (dict, list)):
-                # Convert complex objects to string so they can be hashed
-                target_set.add(json.dumps(item, ensure_ascii=False))
+                target.setdefault(_freeze(item), item)
             else:
-                target_set.add(str(item))
+                item = str(item)
+                target.setdefault(item, item)
 
     for res in chunk_results:
-        safe_update(aggregated["explicit_interests"], res.get("explicit_interests", []))
-        safe_update(aggregated["implicit_interests"], res.get("implicit_interests", []))
-        safe_update(aggregated["gift_mentions"], res.get("gift_mentions", []))
-        safe_update(aggregated["dislikes"], res.get("dislikes", []))
-        safe_update(aggregated["topics_discussed"], res.get("key_dates", []))
-        safe_update(aggregated["relationship_dynamics"], res.get("relationship_dynamics", []))
-        safe_update(aggregated["inside_jokes"], res.get("inside_jokes", []))
-        safe_update(aggregated["closeness_indicators"], res.get("closeness_indicators", []))
-        safe_update(aggregated["sentiment_trend"], res.get("sentiment_trend", [])) 
+        for field, bucket in _AGGREGATE_FIELDS:
+            safe_update(aggregated[bucket], res.get(field, []))
+
+    return aggregated
+
+def aggregate_profiles(chunk_results: List[Dict]) -> AnalysisProfile:
+    """
+    Merges multiple extraction results into a single profile.
+
+    Aggregation is a pure reduce, so large result lists are tree-reduced:
+    partitions are aggregated in worker processes and the (much smaller)
+    partial buckets merged on the main thread. Small runs stay serial.
+    """
+    cpu_count = os.cpu_count() or 1
+    if len(chunk_results) < _PARALLEL_MIN_CHUNKS or cpu_count < 2:
+        aggregated = _aggregate_partition(chunk_results)
+    else:
+        slice_size = -(-len(chunk_results) // cpu_count)
+        partitions = [
+            chunk_results[i:i + slice_size]
+            for i in range(0, len(chunk_results), slice_size)
+        ]
+        aggregated = {bucket: {} for _, bucket in _AGGREGATE_FIELDS}
+        # Spawn rather than fork: aggregation runs on worker threads (the
+        # server and the TUI), and forking a multi-threaded process can
+        # deadlock in the children.
+        with ProcessPoolExecutor(
+            max_workers=cpu_count,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            for partial in executor.map(_aggregate_partition, partitions):
+                for bucket, items in partial.items():
+                    target = aggregated[bucket]
+                    for key, item in items.items():
+                        # setdefault keeps the first occurrence, matching
+                        # the serial path's dedup semantics.
+                        target.setdefault(key, item)
 
     return AnalysisProfile(
-        explicit_interests=list(aggregated["explicit_interests"]),
-        implicit_interests=list(aggregated["implicit_interests"]),
-        gift_mentions=list(aggregated["gift_mentions"]),
-        dislikes=list(aggregated["dislikes"]),
-        topics_discussed=list(aggregated["topics_discussed"]),
-        relationship_dynamics=list(aggregated["relationship_dynamics"]),
-        inside_jokes=list(aggregated["inside_jokes"]),
-        closeness_indicators=list(aggregated["closeness_indicators"]),
-        sentiment_trend=list(aggregated["sentiment_trend"])
+        explicit_interests=list(aggregated["explicit_interests"].values()),
+        implicit_interests=list(aggregated["implicit_interests"].values()),
+        gift_mentions=list(aggregated["gift_mentions"].values()),
+        dislikes=list(aggregated["dislikes"].values()),
+        topics_discussed=list(aggregated["topics_discussed"].values()),
+        relationship_dynamics=list(aggregated["relationship_dynamics"].values()),
+        inside_jokes=list(aggregated["inside_jokes"].values()),
+        closeness_indicators=list(aggregated["closeness_indicators"].values()),
+        sentiment_trend=list(aggregated["sentiment_trend"].values())
     )
 
 def generate_gift_recommendations(profile: AnalysisProfile) -> str:
@@ -249,7 +567,7 @@ def generate_gift_recommendations(profile: AnalysisProfile) -> str:
     if not GEMINI_ACCOUNT_KEYS:
         return "Error: No API Key."
 
-    profile_summary = json.dumps(profile.__dict__, indent=2, ensure_ascii=False)
+    profile_summary = _json_dumps_pretty(asdict(profile))
 
     prompt = f"""
     Based on the following 'Memory Map' of a user's interests derived from their chat history (Hinglish/English), recommend the Top 5 Gifts for them.
@@ -268,10 +586,11 @@ def generate_gift_recommendations(profile: AnalysisProfile) -> str:
     try:
         if key_manager:
             api_key = key_manager.get_active_key()
-            genai.configure(api_key=api_key)
-
-            model = genai.GenerativeModel('gemini-1.5-pro')
-            response = model.generate_content(prompt)
+            client = key_manager.get_client(api_key)
+            response = client.models.generate_content(
+                model='gemini-1.5-pro',
+                contents=prompt
+            )
             return response.text
         else:
             return "Error: KeyManager not initialized."
@@ -295,7 +614,7 @@ def generate_relationship_report(profile: AnalysisProfile) -> str:
         "sentiment_history": profile.sentiment_trend,
         "topics": profile.topics_discussed
     }
-    profile_summary = json.dumps(profile_data, indent=2, ensure_ascii=False)
+    profile_summary = _json_dumps_pretty(profile_data)
 
     prompt = f"""
     You are an expert Relationship Psychologist.
@@ -327,14 +646,15 @@ def generate_relationship_report(profile: AnalysisProfile) -> str:
         
         if key_manager:
             api_key = key_manager.get_active_key()
-            genai.configure(api_key=api_key)
-            
-            model = genai.GenerativeModel('gemini-1.5-pro')
-            response = model.generate_content(prompt)
+            client = key_manager.get_client(api_key)
+            response = client.models.generate_content(
+                model='gemini-1.5-pro',
+                contents=prompt
+            )
             return response.text
         else:
              return "Error: KeyManager not initialized."
-             
+
     except Exception as e:
         logger.error(f"Error generating relationship report: {e}")
         return "Could not generate relationship report due to an error."
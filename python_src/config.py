@@ -1,4 +1,6 @@
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
 
 # Base Paths
@@ -44,38 +46,39 @@ from dotenv import load_dotenv
 ENV_PATH = Path(__file__).resolve().parent / ".env"
 load_dotenv(ENV_PATH)
 
+# Matches GEMINI_ACCOUNT_{ACC_ID}_KEY_{KEY_ID} and captures both IDs in one pass
+_KEY_RE = re.compile(r'^GEMINI_ACCOUNT_(.+?)_KEY_(\d+)$')
+
+@lru_cache(maxsize=1)
 def load_gemini_keys():
-    """Dynamically loads Gemini API keys from environment variables."""
+    """
+    Dynamically loads Gemini API keys from environment variables.
+    Cached: the environment does not change after load_dotenv, so the
+    os.environ scan only happens on the first call.
+    """
     accounts = {}
-    
+
     # Iterate over all environment variables
     for key, value in os.environ.items():
-        if key.startswith("GEMINI_ACCOUNT_") and "_KEY_" in key:
-            try:
-                # Parse the key structure: GEMINI_ACCOUNT_{ACC_ID}_KEY_{KEY_ID}
-                parts = key.split("_")
-                # Expected format: ['GEMINI', 'ACCOUNT', '{ACC_ID}', 'KEY', '{KEY_ID}']
-                if len(parts) >= 5:
-                    acc_id = parts[2]
-                    # We store keys in a set first to avoid duplicates if any, though dict keys are unique
-                    if acc_id not in accounts:
-                        accounts[acc_id] = []
-                    accounts[acc_id].append((key, value))
-            except Exception:
-                continue
-    
+        m = _KEY_RE.match(key)
+        if not m:
+            continue
+        acc_id = m.group(1)
+        key_id = int(m.group(2))
+        accounts.setdefault(acc_id, []).append((key_id, value))
+
     # Sort accounts by ID (to ensure consistent order if IDs are numeric-like)
     # We attempt to sort by integer value if possible, else string
     sorted_acc_ids = sorted(accounts.keys(), key=lambda x: int(x) if x.isdigit() else x)
-    
+
     final_keys = []
     for acc_id in sorted_acc_ids:
-        # Sort keys within each account by the variable name (which includes the KEY_ID)
-        # This checks the full string 'GEMINI_ACCOUNT_2_KEY_1', so it sorts by KEY_ID naturally
-        sorted_account_keys = [val for _, val in sorted(accounts[acc_id], key=lambda x: x[0])]
+        # Sort keys within each account numerically by KEY_ID (so KEY_10
+        # comes after KEY_2, which a lexicographic sort would get wrong)
+        sorted_account_keys = [val for _, val in sorted(accounts[acc_id])]
         if sorted_account_keys:
             final_keys.append(sorted_account_keys)
-            
+
     return final_keys
 
 GEMINI_ACCOUNT_KEYS = load_gemini_keys()
@@ -1,9 +1,12 @@
+import os
 import sys
 import json
 import logging
 import argparse
 from pathlib import Path
+from dataclasses import asdict
 from datetime import datetime
+from operator import attrgetter
 import shutil
 
 # Add src to python path to allow imports if running from root
@@ -17,9 +20,9 @@ from config import (
 )
 from parsers import parse_whatsapp, parse_instagram
 from analyzer import (
-    chunk_messages, 
-    analyze_chunk, 
-    aggregate_profiles, 
+    chunk_messages,
+    analyze_chunks,
+    aggregate_profiles,
     generate_gift_recommendations,
     generate_relationship_report,
     construct_analysis_prompt,
@@ -43,6 +46,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger("GiftRecSystem")
 
+def _fast_copy(src: Path, dst: Path):
+    """
+    Copies `src` to `dst` as cheaply as the filesystem allows. A fresh run
+    directory is created every run, so multi-MB exports get duplicated
+    each time; a hardlink makes that O(1) in time and disk. Falls back to
+    an in-kernel copy_file_range loop (no userspace data round trip) and
+    finally plain shutil.copy2 across filesystems/platforms.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass # Cross-device link, unsupported FS, or dst exists
+
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            while os.copy_file_range(s.fileno(), d.fileno(), 1 << 30):
+                pass
+        shutil.copystat(src, dst)
+        return
+    except (AttributeError, OSError):
+        pass # copy_file_range not available (non-Linux) or refused
+
+    shutil.copy2(src, dst)
+
 def main():
     parser = argparse.ArgumentParser(description="Intelligent Gift Recommendation System")
     parser.add_argument("--dry-run", action="store_true", help="Run without calling Gemini API for testing ingestion.")
@@ -57,6 +85,11 @@ def main():
     target_whatsapp = args.whatsapp if args.whatsapp else WHATSAPP_PATH
     target_instagram = args.instagram if args.instagram else INSTAGRAM_PATH
 
+    # Stat each input once; the result is reused for slug extraction,
+    # copying and parsing below instead of re-checking per step.
+    wa_exists = bool(target_whatsapp and target_whatsapp.exists())
+    ig_exists = bool(target_instagram and target_instagram.exists())
+
 
     # --- Dynamic Output Setup ---
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -65,14 +98,14 @@ def main():
     chat_slug = "unknown_chat"
     person_name = "Unknown"
     
-    if target_whatsapp and target_whatsapp.exists():
+    if wa_exists:
         # e.g. "WhatsApp Chat with Shivam Dwivedi.txt" -> "WhatsApp_Chat_with_Shivam_Dwivedi"
         chat_slug = target_whatsapp.stem.replace(" ", "_").replace(".", "")
         # Extract person name if possible (heuristic: after "WhatsApp Chat with ")
         if "WhatsApp Chat with " in target_whatsapp.stem:
             person_name = target_whatsapp.stem.replace("WhatsApp Chat with ", "").strip()
             
-    elif target_instagram and target_instagram.exists():
+    elif ig_exists:
         chat_slug = target_instagram.stem.replace(" ", "_")
 
     # Create Run Directory
@@ -96,19 +129,19 @@ def main():
     logger.info(f"Created output directory for this run: {RUN_DIR}")
 
     # Copy and Rename Original Files
-    if target_whatsapp and target_whatsapp.exists():
+    if wa_exists:
         # Copy with original name or normalized? User said "original chats, where whatsapp chat text file will be copied"
         # and "instagram json will be modified with the name of the person"
         dest_wa = ORIGINAL_CHATS_DIR / target_whatsapp.name
-        shutil.copy2(target_whatsapp, dest_wa)
+        _fast_copy(target_whatsapp, dest_wa)
         logger.info(f"Copied WhatsApp chat to: {dest_wa}")
         
-    if target_instagram and target_instagram.exists():
+    if ig_exists:
         # Rename Instagram file: "Instagram_Chat_with_<PersonName>.json"
         safe_person_name = person_name.replace(" ", "_").replace(".", "")
         new_filename = f"Instagram_Chat_with_{safe_person_name}.json"
         dest_ig = ORIGINAL_CHATS_DIR / new_filename
-        shutil.copy2(target_instagram, dest_ig)
+        _fast_copy(target_instagram, dest_ig)
         logger.info(f"Copied & Renamed Instagram chat to: {dest_ig}")
 
     # Define Dynamic File Paths
@@ -127,14 +160,14 @@ def main():
     # which is complex and likely not what is desired for 'clean' output).
     # So we simply parse the inputs.
     
-    if target_whatsapp and target_whatsapp.exists():
+    if wa_exists:
         logger.info(f"Parsing WhatsApp: {target_whatsapp}")
         wa_msgs = parse_whatsapp(target_whatsapp)
         all_messages.extend(wa_msgs)
     else:
         if target_whatsapp: logger.warning(f"WhatsApp file not found at {target_whatsapp}")
 
-    if target_instagram and target_instagram.exists():
+    if ig_exists:
         logger.info(f"Parsing Instagram: {target_instagram}")
         ig_msgs = parse_instagram(target_instagram)
         all_messages.extend(ig_msgs)
@@ -146,7 +179,8 @@ def main():
         return
 
     # 2. Sorting & Deduplication (Basic)
-    all_messages.sort(key=lambda x: x.timestamp)
+    # attrgetter extracts the key in C, unlike a Python lambda
+    all_messages.sort(key=attrgetter('timestamp'))
     logger.info(f"Total messages loaded: {len(all_messages)}")
 
     # Save Processed Data (OPTIMIZED FORMAT)
@@ -193,17 +227,24 @@ def main():
         
         # Save SINGLE system prompt file
         p_file = PROMPTS_DIR / "system_instruction.txt"
-        with open(p_file, "w", encoding="utf-8") as f:
-            f.write(system_instruction)
-        
+        p_file.write_text(system_instruction, encoding="utf-8")
+
         logger.info(f"Successfully saved system instruction to: {p_file}")
         logger.info("Use this prompt to process the JSON chunks in Google AI Studio.")
         return
 
     chunk_results = []
     total_chunks = len(chunks)
-    
-    # Check if there is an existing checkpoint (Only relevant if we restart *this* specific run context, 
+
+    # Checkpointing is two-tier: CHECKPOINT_FILE holds an atomic full
+    # snapshot (rewritten only every N chunks via tmp + os.replace, so a
+    # kill mid-write can never truncate it), and an append-only .jsonl
+    # sidecar gets one line per completed chunk. Appending a line is O(1)
+    # per chunk instead of rewriting the whole array, and a crash loses at
+    # most one partial trailing line.
+    CHECKPOINT_JSONL = CHECKPOINT_FILE.with_suffix('.jsonl')
+
+    # Check if there is an existing checkpoint (Only relevant if we restart *this* specific run context,
     # but practically minimal since we make new dirs. Could be useful if we manually point to it.)
     if CHECKPOINT_FILE.exists():
         logger.info(f"Found checkpoint file at {CHECKPOINT_FILE}. Loading...")
@@ -214,20 +255,68 @@ def main():
         except Exception as e:
             logger.error(f"Failed to load checkpoint: {e}")
 
+    # Replay the JSONL tail: lines beyond the last consolidated snapshot
+    # are chunks that completed after it was written.
+    if CHECKPOINT_JSONL.exists():
+        try:
+            replayed = 0
+            with open(CHECKPOINT_JSONL, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f):
+                    if line_no < len(chunk_results):
+                        continue # Already covered by the snapshot
+                    try:
+                        chunk_results.append(json.loads(line))
+                        replayed += 1
+                    except json.JSONDecodeError:
+                        break # Partial trailing line from a crash
+            if replayed:
+                logger.info(f"Replayed {replayed} chunks from checkpoint sidecar.")
+        except Exception as e:
+            logger.error(f"Failed to read checkpoint sidecar: {e}")
+
     # Start from where we left off
     start_index = len(chunk_results)
+    consolidated_count = start_index
+
+    # Consolidate the snapshot every this many completed chunks.
+    CONSOLIDATE_EVERY = 20
+
+    def _consolidate_checkpoint():
+        nonlocal consolidated_count
+        tmp_path = CHECKPOINT_FILE.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(chunk_results, f, ensure_ascii=False)
+        os.replace(tmp_path, CHECKPOINT_FILE)
+        consolidated_count = len(chunk_results)
+
+    # Chunks complete out of order, so buffer results and only flush the
+    # contiguous prefix to the checkpoint (resume-by-length stays valid).
+    pending_results = {}
+    sidecar = open(CHECKPOINT_JSONL, 'a', encoding='utf-8')
+
+    def _on_chunk_done(index, result):
+        logger.info(f"Chunk {index+1}/{total_chunks} analyzed.")
+        pending_results[index] = result
+        flushed = False
+        while len(chunk_results) in pending_results:
+            flushed_result = pending_results.pop(len(chunk_results))
+            chunk_results.append(flushed_result)
+            sidecar.write(json.dumps(flushed_result, ensure_ascii=False) + '\n')
+            flushed = True
+
+        if flushed:
+            sidecar.flush()
+            os.fsync(sidecar.fileno())
+            if len(chunk_results) - consolidated_count >= CONSOLIDATE_EVERY:
+                _consolidate_checkpoint()
+
+    logger.info(f"Analyzing {total_chunks - start_index} chunks concurrently across API keys...")
+    try:
+        analyze_chunks(chunks, start_index=start_index, on_result=_on_chunk_done)
+    finally:
+        sidecar.close()
+    _consolidate_checkpoint()
 
-    for i in range(start_index, total_chunks):
-        chunk = chunks[i]
-        logger.info(f"Analyzing chunk {i+1}/{total_chunks}...")
-        result = analyze_chunk(i, chunk)
-        if result:
-            chunk_results.append(result)
-            
-            # Save checkpoint every chunk
-            with open(CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(chunk_results, f, ensure_ascii=False)
-        
     # 4. Aggregation
     logger.info("Aggregating Memory Map...")
     memory_map = aggregate_profiles(chunk_results)
@@ -235,7 +324,7 @@ def main():
     # Save Memory Map
     with open(MEMORY_MAP_PATH, 'w', encoding='utf-8') as f:
         # Convert dataclass to dict via json dump default or custom
-        f.write(json.dumps(memory_map.__dict__, indent=2, ensure_ascii=False))
+        f.write(json.dumps(asdict(memory_map), indent=2, ensure_ascii=False))
     logger.info(f"Memory Map saved to {MEMORY_MAP_PATH}")
 
     # 5. Recommendation
@@ -2,11 +2,15 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class UnifiedMessage:
     """
     Represents a single message from any platform (WhatsApp/Instagram)
     normalized to a common format.
+
+    Slotted: chats can hold hundreds of thousands of these, and slots
+    drop the per-instance __dict__ (roughly halving memory per message)
+    while making attribute access slightly faster.
     """
     timestamp: datetime
     platform: str # 'WhatsApp' or 'Instagram'
@@ -21,10 +25,13 @@ class UnifiedMessage:
             "content": self.content
         }
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisProfile:
     """
     Aggregated profile containing both gift interests and relationship analysis.
+
+    Slotted for consistency with UnifiedMessage; serialize instances with
+    dataclasses.asdict (slotted instances have no __dict__).
     """
     # Interest Fields
     explicit_interests: List[str]
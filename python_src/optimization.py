@@ -1,6 +1,10 @@
 from typing import List, Dict, Any, Union
+import io
 import json
 import math
+import re
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
 from datetime import datetime
 
@@ -10,46 +14,167 @@ if __package__:
 else:
     from models import UnifiedMessage
 
+# orjson encodes/decodes JSON several times faster than the stdlib; its
+# compact UTF-8 default matches the separators/ensure_ascii settings used
+# here, so both codecs produce identical files. Optional dependency.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson parses JSON incrementally; used when merging multi-part files so
+# only one column of one part is materialized at a time on top of the
+# merged arrays, instead of a whole decoded part dict.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# zstandard enables .json.zst output for archival use: the columnar
+# layout puts like-typed values (deltas, indices) next to each other, so
+# the files compress extremely well, and zstd decompresses fast enough
+# that loads stay I/O-bound. Optional; plain .json paths never need it.
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+def _open_out(save_path: Path):
+    """
+    Opens an output path for text writing. Paths ending in .zst are
+    transparently zstd-compressed on the way to disk.
+    """
+    if save_path.suffix == '.zst':
+        if zstd is None:
+            raise RuntimeError("zstandard is required to write .zst files")
+        raw = open(save_path, 'wb')
+        writer = zstd.ZstdCompressor(level=3).stream_writer(raw)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    return open(save_path, 'w', encoding='utf-8', buffering=1 << 16)
+
+def _read_bytes(path: Path) -> bytes:
+    """Reads a file fully, transparently decompressing .zst paths."""
+    if path.suffix == '.zst':
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read .zst files")
+        with open(path, 'rb') as raw:
+            with zstd.ZstdDecompressor().stream_reader(raw) as reader:
+                return reader.read()
+    return path.read_bytes()
+
+def _dumps_compact(obj) -> str:
+    """Serializes `obj` as compact JSON with non-ASCII kept as-is."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def _loads(data):
+    """Parses JSON from a str/bytes payload."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Contents longer than this are stored inline instead of dictionary-
+# encoded; long bodies are rarely duplicated and would bloat the dict.
+_CONTENT_DICT_MAX_LEN = 64
+
 def convert_to_optimized_format(messages: List[UnifiedMessage]) -> Dict[str, Any]:
     """
     Converts a list of UnifiedMessage objects into a highly optimized table format.
+
+    The table is columnar (one list per field) rather than row-of-rows:
+    per-record bracket/comma overhead disappears from the JSON, each
+    column serializes as a homogeneous list, and decoding is a single
+    zip() over the columns.
+
+    Short message bodies are dictionary-encoded the same way platforms
+    and senders are: chats repeat "ok"/"haha"/emoji replies constantly,
+    so those store as a small int index into meta["content_dict"]. Long
+    bodies (rarely duplicated) stay inline strings to keep the dict small.
+
+    Timestamps are delta-encoded: meta["ts_base"] holds the first
+    message's epoch milliseconds and the ts_delta column stores the
+    ms offset from the previous message. Messages arrive sorted, so the
+    deltas are small integers (~3-6 JSON chars) instead of ~26-char ISO
+    strings, and decoding is integer addition instead of fromisoformat.
     """
-    platforms = []
-    senders = []
-    platform_map = {}
-    sender_map = {}
+    platform_map: Dict[str, int] = {}
+    sender_map: Dict[str, int] = {}
+    content_dict: List[str] = []
+    content_map: Dict[str, int] = {}
+
+    n = len(messages)
+    ts_delta: List[int] = [0] * n
+    platform_idx: List[int] = [0] * n
+    sender_idx: List[int] = [0] * n
+    contents: List[Union[int, str]] = [None] * n
+
+    ts_base = round(messages[0].timestamp.timestamp() * 1000) if messages else 0
+    prev_epoch = ts_base
 
-    data = []
+    # Hoisted bound methods: the loop body is pure interpreter work, so
+    # shaving attribute lookups per message is worth it at this scale.
+    pmap_setdefault = platform_map.setdefault
+    smap_setdefault = sender_map.setdefault
+    cmap_get = content_map.get
+    cdict_append = content_dict.append
 
-    for msg in messages:
-        p = msg.platform
-        if p not in platform_map:
-            platform_map[p] = len(platforms)
-            platforms.append(p)
-        p_idx = platform_map[p]
+    for i, msg in enumerate(messages):
+        # setdefault both looks up and interns in one hash operation
+        platform_idx[i] = pmap_setdefault(msg.platform, len(platform_map))
+        sender_idx[i] = smap_setdefault(msg.sender, len(sender_map))
 
-        s = msg.sender
-        if s not in sender_map:
-            sender_map[s] = len(senders)
-            senders.append(s)
-        s_idx = sender_map[s]
+        c = msg.content
+        if len(c) <= _CONTENT_DICT_MAX_LEN:
+            ci = cmap_get(c)
+            if ci is None:
+                ci = len(content_dict)
+                content_map[c] = ci
+                cdict_append(c)
+            c = ci
 
-        # DateTime to ISO string
-        ts = msg.timestamp.isoformat()
-        content = msg.content
+        # DateTime to ms offset from the previous message
+        epoch = round(msg.timestamp.timestamp() * 1000)
+        ts_delta[i] = epoch - prev_epoch
+        prev_epoch = epoch
 
-        row = [ts, p_idx, s_idx, content]
-        data.append(row)
+        contents[i] = c
 
     return {
         "meta": {
-            "platforms": platforms,
-            "senders": senders
+            # Insertion-ordered dicts double as the index lists
+            "platforms": list(platform_map),
+            "senders": list(sender_map),
+            "content_dict": content_dict,
+            "ts_base": ts_base
         },
-        "columns": ["timestamp", "platform_idx", "sender_idx", "content"],
-        "data": data
+        "columns": ["ts_delta", "platform_idx", "sender_idx", "content"],
+        "data": {
+            "ts_delta": ts_delta,
+            "platform_idx": platform_idx,
+            "sender_idx": sender_idx,
+            "content": contents
+        }
     }
 
+# Column values are serialized in batches this size, so the encoder never
+# materializes more than one small slice of JSON text at a time.
+_WRITE_BATCH = 4096
+
+def _write_json_array(f, col, start, end):
+    """
+    Writes col[start:end] to `f` as a JSON array in batches, avoiding one
+    full-column string (or column copy) in memory.
+    """
+    f.write('[')
+    for i in range(start, end, _WRITE_BATCH):
+        if i > start:
+            f.write(',')
+        batch = col[i:min(i + _WRITE_BATCH, end)]
+        # Strip the enclosing brackets; batches share one outer array
+        f.write(_dumps_compact(batch)[1:-1])
+    f.write(']')
+
 def estimate_tokens(text: str) -> int:
     """
     Rough estimation of tokens.
@@ -67,26 +192,24 @@ def save_optimized_json(data: Dict[str, Any], filepath: Path, max_tokens: int =
     """
     meta = data['meta']
     columns = data['columns']
-    rows = data['data']
-    
+    data_columns = data['data']
+    contents = data_columns['content']
+    content_dict = meta.get('content_dict', [])
+    n = len(contents)
+
     # Calculate base overhead tokens (meta + columns)
-    # We serialize it to check size
-    base_structure = {"meta": meta, "columns": columns, "data": []}
+    # We serialize it to check size. The content dictionary is excluded:
+    # each part rebuilds its own dictionary from the rows it holds, so
+    # the global dict is never written out and must not eat the split
+    # budget (a chat with many unique short messages can push it past
+    # max_tokens on its own, degenerating the split to one row per part).
+    base_structure = {"meta": {**meta, "content_dict": []}, "columns": columns, "data": {}}
     base_json = json.dumps(base_structure, separators=(',', ':'), ensure_ascii=False)
     base_tokens = estimate_tokens(base_json)
-    
-    current_tokens = base_tokens
-    current_chunk_rows = []
-    part_number = 1
-    
-    # Helper to save a chunk
-    def save_chunk(rows_to_save, part_num, total_parts=None):
-        chunk_data = {
-            "meta": meta,
-            "columns": columns,
-            "data": rows_to_save
-        }
-        
+
+    # Helper to save a part as column slices, streamed to the file so the
+    # encoder never holds a whole part (columns copies + JSON text) at once
+    def save_chunk(start, end, part_num, total_parts=None):
         # Determine filename
         if total_parts == 1 and part_num == 1:
             # If only one part, use original filename
@@ -95,43 +218,80 @@ def save_optimized_json(data: Dict[str, Any], filepath: Path, max_tokens: int =
             # If multiple, use _partX suffix
             # e.g. processed_chat_history.json -> processed_chat_history_part1.json
             save_path = filepath.with_name(f"{filepath.stem}_part{part_num}{filepath.suffix}")
-            
-        with open(save_path, 'w', encoding='utf-8') as f:
-            json.dump(chunk_data, f, separators=(',', ':'), ensure_ascii=False)
+
+        # Rebuild the content dictionary from this part's rows only.
+        # Copying the global dictionary into every part can dwarf the
+        # rows themselves once the chat has many unique short messages.
+        local_dict: List[str] = []
+        local_idx: Dict[int, int] = {}
+        part_contents: List[Union[int, str]] = [None] * (end - start)
+        for i in range(start, end):
+            c = contents[i]
+            if isinstance(c, int):
+                li = local_idx.get(c)
+                if li is None:
+                    li = len(local_dict)
+                    local_idx[c] = li
+                    local_dict.append(content_dict[c])
+                c = li
+            part_contents[i - start] = c
+        part_meta = {**meta, "content_dict": local_dict}
+
+        with _open_out(save_path) as f:
+            f.write('{"meta":')
+            f.write(_dumps_compact(part_meta))
+            f.write(',"columns":')
+            f.write(_dumps_compact(columns))
+            f.write(',"data":{')
+            for col_i, (name, col) in enumerate(data_columns.items()):
+                if col_i:
+                    f.write(',')
+                f.write(f'"{name}":')
+                if name == "content":
+                    _write_json_array(f, part_contents, 0, len(part_contents))
+                else:
+                    _write_json_array(f, col, start, end)
+            f.write('}}')
         return save_path
 
-    # First pass: Check if we even need to split?
-    # Actually, let's just stream through and split as we go.
-    
-    saved_files = []
-    
-    for row in rows:
-        # row schema: [timestamp, platform_idx, sender_idx, content]
-        # Content is usually the bulk of tokens.
-        content = row[3]
-        row_tokens = estimate_tokens(content if content else "") + 10 # +10 for metadata overhead in row
-        
-        if current_tokens + row_tokens > max_tokens and current_chunk_rows:
-            # Functionally "full", save current chunk
-            saved_files.append(current_chunk_rows)
-            # Reset
-            current_chunk_rows = []
-            current_tokens = base_tokens
-        
-        current_chunk_rows.append(row)
-        current_tokens += row_tokens
-        
-    # Add last chunk
-    if current_chunk_rows:
-        saved_files.append(current_chunk_rows)
-        
+    # First pass: find the split boundaries as (start, end) index ranges.
+    # Content is usually the bulk of tokens; +10 for per-record overhead.
+    # With the prefix sums in hand, each boundary is one binary search for
+    # the largest end whose cumulative size fits the part budget - no
+    # running Python-level total per record.
+    # Dict-encoded entries are charged their full string cost plus 8 for
+    # the index: the string lands in the part's dictionary at most once,
+    # so this is a conservative upper bound per record.
+    cum_tokens = list(accumulate(
+        (estimate_tokens(c) if isinstance(c, str)
+         else estimate_tokens(content_dict[c]) + 8) + 10
+        for c in contents
+    ))
+    budget = max_tokens - base_tokens
+    if budget <= 0:
+        raise ValueError(
+            f"max_tokens={max_tokens} cannot fit the base metadata overhead "
+            f"({base_tokens} tokens); splitting would degenerate to one record per part."
+        )
+
+    split_ranges = []
+    start = 0
+    while start < n:
+        prev = cum_tokens[start - 1] if start else 0
+        end = bisect_right(cum_tokens, prev + budget)
+        if end <= start:
+            # A single record over budget still gets its own part
+            end = start + 1
+        split_ranges.append((start, end))
+        start = end
+
     # Now actually write the files
-    num_parts = len(saved_files)
+    num_parts = len(split_ranges)
     created_paths = []
-    for i, rows_in_chunk in enumerate(saved_files):
-        path = save_chunk(rows_in_chunk, i + 1, num_parts)
+    for i, (range_start, range_end) in enumerate(split_ranges):
+        path = save_chunk(range_start, range_end, i + 1, num_parts)
         created_paths.append(path)
-        
+
     return created_paths
 
 def load_optimized_json(filepath: Path) -> Dict[str, Any]:
@@ -141,8 +301,7 @@ def load_optimized_json(filepath: Path) -> Dict[str, Any]:
     """
     # 1. Check if the exact single file exists
     if filepath.exists():
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _loads(_read_bytes(filepath))
             
     # 2. Check for parts
     directory = filepath.parent
@@ -152,62 +311,179 @@ def load_optimized_json(filepath: Path) -> Dict[str, Any]:
     # Look for stem_part*.json
     # We want to find files that match the pattern, distinct from other files
     # E.g. processed_chat_history_part1.json
-    
-    parts = sorted(directory.glob(f"{stem}_part*{suffix}"))
-    
+    # Sort numerically by part number: a lexicographic sort puts _part10
+    # before _part2 and would silently merge columns out of order.
+    part_pattern = re.compile(re.escape(stem) + r"_part(\d+)" + re.escape(suffix) + r"$")
+    numbered_parts = []
+    for candidate in directory.iterdir():
+        m = part_pattern.match(candidate.name)
+        if m:
+            numbered_parts.append((int(m.group(1)), candidate))
+    numbered_parts.sort()
+    parts = [p for _, p in numbered_parts]
+
     if not parts:
         raise FileNotFoundError(f"No file found at {filepath} and no parts found matching {stem}_part*{suffix}")
         
-    # Merge parts
+    # Merge parts by extending each column in order. Each part carries
+    # its own content dictionary (built from its rows alone), so content
+    # indices are remapped onto one merged dictionary as parts are read.
     merged_data = None
-    all_rows = []
-    
+    merged_columns: Dict[str, list] = {}
+    merged_content_dict: List[str] = []
+    merged_content_map: Dict[str, int] = {}
+
+    def content_remap(part_meta):
+        # Maps this part's local dictionary indices onto the merged
+        # dictionary, deduplicating strings shared across parts.
+        remap = []
+        for s in (part_meta or {}).get("content_dict", []):
+            mi = merged_content_map.get(s)
+            if mi is None:
+                mi = len(merged_content_dict)
+                merged_content_map[s] = mi
+                merged_content_dict.append(s)
+            remap.append(mi)
+        return remap
+
     for part in parts:
-        with open(part, 'r', encoding='utf-8') as f:
-            part_data = json.load(f)
-            
+        # .zst parts go through the one-shot decompress path below
+        if ijson is not None and part.suffix != '.zst':
+            # Header scan: every part's meta is needed for its content
+            # dictionary; columns only from the first. The writer emits
+            # meta and columns before data, so breaking here never
+            # touches the (large) data object.
+            with open(part, 'rb') as f:
+                part_meta = part_columns = None
+                for key, value in ijson.kvitems(f, ''):
+                    if key == "meta":
+                        part_meta = value
+                        if merged_data is not None:
+                            break
+                    elif key == "columns":
+                        part_columns = value
+                        break
+            if merged_data is None:
+                merged_data = {
+                    "meta": part_meta,
+                    "columns": part_columns,
+                    "data": merged_columns # Will fill this
+                }
+
+            # Stream the data object one column at a time
+            remap = content_remap(part_meta)
+            streamed = False
+            with open(part, 'rb') as f:
+                for name, col in ijson.kvitems(f, 'data'):
+                    if name == "content" and remap:
+                        col = [remap[c] if isinstance(c, int) else c for c in col]
+                    merged_columns.setdefault(name, []).extend(col)
+                    streamed = True
+            if streamed:
+                if isinstance(merged_data.get("meta"), dict):
+                    merged_data["meta"]["content_dict"] = merged_content_dict
+                continue
+            # kvitems yields nothing when "data" is an array - the
+            # pre-columnar row format - so fall through to the one-shot
+            # decode for this part.
+
+        part_data = _loads(_read_bytes(part))
+        payload = part_data.get("data", {})
+
         if merged_data is None:
             # Initialize with meta/columns from first part
             merged_data = {
                 "meta": part_data.get("meta"),
                 "columns": part_data.get("columns"),
-                "data": [] # Will fill this
+                "data": merged_columns # Will fill this
             }
-        
-        # Append rows
-        all_rows.extend(part_data.get("data", []))
-        
+
+        if isinstance(payload, list):
+            # Pre-columnar files store "data" as a list of rows; keep the
+            # merged payload a list so the decoder sees the same shape.
+            # That generation duplicated one global dictionary into every
+            # part, so its indices need no remapping.
+            if isinstance(merged_data["data"], list):
+                merged_data["data"].extend(payload)
+            else:
+                merged_data["data"] = list(payload)
+        else:
+            remap = content_remap(part_data.get("meta"))
+            for name, col in payload.items():
+                if name == "content" and remap:
+                    col = [remap[c] if isinstance(c, int) else c for c in col]
+                merged_columns.setdefault(name, []).extend(col)
+            if isinstance(merged_data.get("meta"), dict):
+                merged_data["meta"]["content_dict"] = merged_content_dict
+
     if merged_data:
-        merged_data["data"] = all_rows
         return merged_data
-    
+
     raise ValueError("Empty parts found.")
 
-def decode_to_unified_messages(data: Dict[str, Any]) -> List[UnifiedMessage]:
+def iter_unified_messages(data: Dict[str, Any]):
     """
-    Decodes the optimized dictionary back into a list of UnifiedMessage objects.
+    Lazily decodes the optimized dictionary, yielding one UnifiedMessage
+    at a time. Callers that only stream over the chat hold O(1) messages
+    in memory instead of materializing millions of instances up front.
     """
     meta = data.get("meta", {})
     platforms = meta.get("platforms", [])
     senders = meta.get("senders", [])
-    rows = data.get("data", [])
-    
-    messages = []
-    for row in rows:
-        # Schema: [timestamp, platform_idx, sender_idx, content]
-        ts_str, p_idx, s_idx, content = row
-        
+    content_dict = meta.get("content_dict", [])
+    data_columns = data.get("data", {})
+
+    num_platforms = len(platforms)
+    num_senders = len(senders)
+    num_contents = len(content_dict)
+
+    if isinstance(data_columns, list):
+        # Oldest files store "data" as row tuples of
+        # [iso_ts, platform_idx, sender_idx, content].
+        timestamps = (datetime.fromisoformat(row[0]) for row in data_columns)
+        platform_idxs = (row[1] for row in data_columns)
+        sender_idxs = (row[2] for row in data_columns)
+        contents = (row[3] for row in data_columns)
+    else:
+        if "ts_delta" in data_columns:
+            # Delta-encoded epoch ms: a running sum over the deltas replaces
+            # one fromisoformat string parse per row.
+            ts_base = meta.get("ts_base", 0)
+            timestamps = (
+                datetime.fromtimestamp((ts_base + offset) / 1000.0)
+                for offset in accumulate(data_columns["ts_delta"])
+            )
+        else:
+            # Legacy files store ISO strings
+            timestamps = (
+                datetime.fromisoformat(ts_str)
+                for ts_str in data_columns.get("timestamp", [])
+            )
+        platform_idxs = data_columns.get("platform_idx", [])
+        sender_idxs = data_columns.get("sender_idx", [])
+        contents = data_columns.get("content", [])
+
+    # Columns are aligned, so one zip walks all four in lockstep.
+    for dt, p_idx, s_idx, content in zip(
+        timestamps, platform_idxs, sender_idxs, contents
+    ):
         # Safe lookup in case indices are weird (though they shouldn't be)
-        platform = platforms[p_idx] if 0 <= p_idx < len(platforms) else "Unknown"
-        sender = senders[s_idx] if 0 <= s_idx < len(senders) else "Unknown"
-        
-        dt = datetime.fromisoformat(ts_str)
-        
-        messages.append(UnifiedMessage(
+        platform = platforms[p_idx] if 0 <= p_idx < num_platforms else "Unknown"
+        sender = senders[s_idx] if 0 <= s_idx < num_senders else "Unknown"
+
+        # Short bodies are dictionary-encoded as int indices
+        if isinstance(content, int):
+            content = content_dict[content] if 0 <= content < num_contents else ""
+
+        yield UnifiedMessage(
             timestamp=dt,
             platform=platform,
             sender=sender,
             content=content
-        ))
-        
-    return messages
+        )
+
+def decode_to_unified_messages(data: Dict[str, Any]) -> List[UnifiedMessage]:
+    """
+    Decodes the optimized dictionary back into a list of UnifiedMessage objects.
+    """
+    return list(iter_unified_messages(data))
@@ -1,7 +1,12 @@
+import os
 import re
 import json
+import mmap
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 from pathlib import Path
 
 # Adjust import based on usage (script vs package)
@@ -10,6 +15,146 @@ if __package__:
 else:
     from models import UnifiedMessage
 
+# ijson parses JSON incrementally, so huge Instagram exports never have to
+# be materialized in memory at once; fall back to one-shot stdlib json.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson parses JSON several times faster than the stdlib; used for the
+# one-shot (non-ijson) Instagram path when installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Matches one full WhatsApp message - header plus any continuation lines - in
+# a single pass over the raw bytes of the export:
+# - Date: d/m/y or d/m/Y (2 or 4 digits)
+# - Time: H:M or I:M am/pm (separated by an optional space or the narrow
+#   no-break space U+202F, which is \xe2\x80\xaf in UTF-8)
+# - Sender: any characters until ": "
+# - Content: the rest of the line, plus every following line that does NOT
+#   start with a new "d/m/y, H:MM" timestamp header (multi-line messages are
+#   captured in the same match, so there is no per-line Python loop).
+_WA_MESSAGE_PATTERN = re.compile(
+    rb"^(\d{1,2}/\d{1,2}/\d{2,4}),[ \t]*"
+    rb"(\d{1,2}:\d{2}(?:(?:[ \t]|\xe2\x80\xaf)?[aApP][mM])?) - "
+    rb"(.*?): (.*(?:\r?\n(?!\d{1,2}/\d{1,2}/\d{2,4},[ \t]*\d{1,2}:\d{2}).*)*)",
+    re.MULTILINE
+)
+
+# Parsed-timestamp cache: chat timestamps repeat heavily (minute
+# granularity), so each distinct (date, time) pair - including
+# unparseable ones, cached as None - is only run through strptime once
+# per process, even across files and parallel build slices.
+_ts_cache: dict = {}
+
+def _parse_wa_timestamp(date_str: str, time_str: str) -> Optional[datetime]:
+    """
+    Parses a WhatsApp "d/m/y" date plus "H:MM"/"I:MM am" time pair.
+    Returns None when no known format matches. Results are memoized.
+    """
+    cache_key = (date_str, time_str)
+    if cache_key in _ts_cache:
+        return _ts_cache[cache_key]
+
+    # The matcher regex already guarantees the d/m/y and H:MM[ am/pm]
+    # shapes, so the fields are converted with int() and assembled into a
+    # datetime directly - strptime re-parses its format string and does
+    # locale work on every call, which is wasteful in this hot path.
+    # Replace narrow no-break space (\u202f) with standard space first.
+    clean_time_str = time_str.replace('\u202f', ' ').strip()
+
+    dt = None
+    try:
+        # Split off a trailing am/pm marker if present ("11:59 pm", "11:59pm")
+        ampm = None
+        if clean_time_str[-1] in 'mM':
+            ampm = clean_time_str[-2]
+            clean_time_str = clean_time_str[:-2].strip()
+
+        hour_str, _, minute_str = clean_time_str.partition(':')
+        hour = int(hour_str)
+        if ampm is not None:
+            # 12h -> 24h: 12am -> 0, 12pm -> 12
+            hour = (hour % 12) + (12 if ampm in 'pP' else 0)
+
+        day_str, month_str, year_str = date_str.split('/')
+        year = int(year_str)
+        if year < 100:
+            year += 2000
+
+        dt = datetime(year, int(month_str), int(day_str), hour, int(minute_str))
+    except (ValueError, IndexError):
+        dt = None
+
+    _ts_cache[cache_key] = dt
+    return dt
+
+# Below this many messages, spawning worker processes costs more than the
+# message construction itself; stay serial for typical exports.
+_PARALLEL_MIN_MESSAGES = 20000
+
+# Placeholder/system message bodies WhatsApp emits instead of real content.
+# Checked with a single set membership instead of per-marker comparisons.
+_SKIP_CONTENT = frozenset({
+    "<Media omitted>",
+    "This message was deleted",
+    "You deleted this message",
+    "null",
+})
+
+def _build_messages(raw_messages: List[Tuple[bytes, bytes, bytes, bytes]]) -> List[UnifiedMessage]:
+    """
+    Builds UnifiedMessage objects from raw (date, time, sender, content)
+    bytes tuples. Pure function, so slices can be mapped across processes.
+    """
+    messages = []
+
+    # Chat timestamps have minute granularity, so the number of unique
+    # (date, time) pairs is far smaller than the message count. Parse each
+    # unique pair exactly once up front instead of per message.
+    unique_timestamps = {
+        (date_b, time_b): None
+        for date_b, time_b, _, _ in raw_messages
+    }
+    for date_b, time_b in unique_timestamps:
+        unique_timestamps[(date_b, time_b)] = _parse_wa_timestamp(
+            date_b.decode('ascii'),
+            time_b.decode('utf-8')
+        )
+
+    for date_b, time_b, sender_b, content_b in raw_messages:
+        content = content_b.decode('utf-8', errors='replace')
+        if '\n' in content:
+            # Multi-line message: strip each line and drop blanks,
+            # matching the old line-by-line accumulation behavior.
+            content = "\n".join(
+                part for part in (p.strip() for p in content.split('\n')) if part
+            )
+        else:
+            content = content.strip()
+
+        # Handling media/system placeholders ("<Media omitted>" etc.)
+        if content in _SKIP_CONTENT:
+            continue
+
+        dt = unique_timestamps[(date_b, time_b)]
+        if not dt:
+            # If all parsing fails, skip this message
+            continue
+
+        messages.append(UnifiedMessage(
+            timestamp=dt,
+            platform="WhatsApp",
+            sender=sender_b.decode('utf-8', errors='replace').strip(),
+            content=content
+        ))
+
+    return messages
+
 def parse_whatsapp(file_path: Path) -> List[UnifiedMessage]:
     """
     Parses WhatsApp exported text file.
@@ -17,137 +162,152 @@ def parse_whatsapp(file_path: Path) -> List[UnifiedMessage]:
     Format line: "18/07/2024, 19:09 - User Name: Message"
              or: "28/08/23, 11:53 am - User Name: Message"
              or: "16/01/26, 11:59 pm - User Name: Message" (with narrow no-break space)
+
+    The file is memory-mapped and scanned with a precompiled bytes pattern,
+    so the regex engine walks the whole buffer in C instead of Python
+    looping line by line; groups are only decoded per matched message.
+    For very large exports, message construction (datetime + decoding) is
+    fanned out across CPU cores with a ProcessPoolExecutor.
     """
-    messages = []
-    # Regex to capture: Date, Time, Sender, Message
-    # Improved regex to handle:
-    # - Date: d/m/y or d/m/Y (2 or 4 digits)
-    # - Time: H:M or I:M am/pm (with optional space, narrow non-break space U+202F, or no space)
-    # - Sender: Any characters until ": "
-    # Note: [\s\u202f]? matches optional regular space or narrow no-break space
-    pattern = re.compile(r"^(\d{1,2}/\d{1,2}/\d{2,4}),\s*(\d{1,2}:\d{2}(?:[\s\u202f]?[aApP][mM])?) - (.*?): (.*)$")
-    
-    current_msg = None
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-                
-            match = pattern.match(line)
-            if match:
-                # Save previous message if it exists
-                if current_msg:
-                    messages.append(current_msg)
-                
-                date_str, time_str, sender, content = match.groups()
-                
-                # Handling "Media omitted"
-                if content.strip() == "<Media omitted>":
-                    current_msg = None 
-                    continue
+    with open(file_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file cannot be mapped
+            return []
 
-                # Normalize time string: 
-                # Replace narrow no-break space (\u202f) with standard space
-                # Also handle any other whitespace variants
-                clean_time_str = time_str.replace('\u202f', ' ').strip()
-                
-                # Normalize am/pm: ensure there's a space before am/pm if present
-                # This handles cases like "11:59pm" -> "11:59 pm"
-                clean_time_str = re.sub(r'(\d{1,2}:\d{2})\s*([aApP][mM])', r'\1 \2', clean_time_str)
-                
-                # Try multiple formats
-                dt = None
-                formats_to_try = [
-                    "%d/%m/%Y %H:%M",       # 24h, 4-digit year
-                    "%d/%m/%y %H:%M",       # 24h, 2-digit year
-                    "%d/%m/%Y %I:%M %p",    # 12h, 4-digit year
-                    "%d/%m/%y %I:%M %p",    # 12h, 2-digit year
-                ]
-                
-                full_dt_str = f"{date_str} {clean_time_str}"
-                
-                # Normalize AM/PM to uppercase for strptime compatibility
-                # strptime %p requires uppercase AM/PM
-                normalized_dt_str = full_dt_str.upper()
-
-                for fmt in formats_to_try:
-                    try:
-                        dt = datetime.strptime(normalized_dt_str, fmt)
-                        break
-                    except ValueError:
-                        continue
-                
-                if not dt:
-                    # If all parsing fails, skip this message
-                    # Uncomment for debugging: print(f"Failed to parse date: {full_dt_str}")
-                    current_msg = None
-                    continue
+        try:
+            raw_messages = _WA_MESSAGE_PATTERN.findall(buf)
+        finally:
+            buf.close()
+
+    cpu_count = os.cpu_count() or 1
+    if len(raw_messages) < _PARALLEL_MIN_MESSAGES or cpu_count < 2:
+        return _build_messages(raw_messages)
+
+    # Split on message boundaries and construct in parallel; results are
+    # concatenated in slice order so chronology is preserved.
+    slice_size = -(-len(raw_messages) // cpu_count)
+    slices = [
+        raw_messages[i:i + slice_size]
+        for i in range(0, len(raw_messages), slice_size)
+    ]
+
+    # Spawn rather than fork: callers run this from worker threads (the
+    # server and the TUI), and forking a multi-threaded process can
+    # deadlock in the children.
+    messages: List[UnifiedMessage] = []
+    with ProcessPoolExecutor(
+        max_workers=cpu_count,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        for part in executor.map(_build_messages, slices):
+            messages.extend(part)
 
-                current_msg = UnifiedMessage(
-                    timestamp=dt,
-                    platform="WhatsApp",
-                    sender=sender.strip(),
-                    content=content
-                )
-            else:
-                # This is a continuation of the previous message (multi-line)
-                if current_msg:
-                    current_msg.content += f"\n{line}"
-    
-    # Append the last message
-    if current_msg:
-        messages.append(current_msg)
-        
     return messages
 
+# Instagram/Facebook exports encode non-ASCII text as latin-1 mojibake
+# (e.g. "Ã©" for "é"). In the raw JSON bytes this shows up as Ã/Â
+# (latin-1 lead bytes) or â (utf-8 punctuation lead byte) escapes, so
+# one substring scan over the file tells us whether any fixing is needed.
+_MOJIBAKE_MARKERS = (b'\\u00c3', b'\\u00c2', b'\\u00e2')
+
+def _fix_mojibake(text: str) -> str:
+    """Re-decodes latin-1 mojibake back to proper UTF-8 text."""
+    try:
+        return text.encode('latin1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text # Keep original if fix fails
+
+@lru_cache(maxsize=4096)
+def _ig_timestamp(ts_ms: int) -> datetime:
+    """
+    Converts an Instagram millisecond timestamp to a datetime. Cached on
+    the exact ms value so bursts of messages sharing a timestamp skip the
+    conversion; the cache is bounded since ms values are mostly unique and
+    the server process is long-running.
+    """
+    return datetime.fromtimestamp(ts_ms / 1000.0)
+
+def _sniff_mojibake(file_path: Path) -> bool:
+    """
+    Scans a file in 1MB chunks for mojibake escape markers without loading
+    it whole. A small tail overlaps chunk boundaries so a marker split
+    across two reads is still found.
+    """
+    tail = b''
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            window = tail + chunk
+            if any(marker in window for marker in _MOJIBAKE_MARKERS):
+                return True
+            tail = chunk[-8:]
+    return False
+
 def parse_instagram(file_path: Path) -> List[UnifiedMessage]:
     """
     Parses Instagram exported JSON file.
     Structure: { "messages": [ { "sender_name": "...", "timestamp_ms": 123, "content": "..." } ] }
+
+    With ijson installed, messages are streamed one at a time so peak
+    memory stays O(1) in the export size; otherwise the whole document is
+    parsed with stdlib json.
     """
     messages = []
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        
-    for msg in data.get("messages", []):
-        sender = msg.get("sender_name")
-        ts_ms = msg.get("timestamp_ms")
-        content = msg.get("content")
-        
-        # Skip messages without text content (e.g., pure media sends without caption)
-        # Note: 'share' key exists for shared posts, might want to capture description
-        if not content:
-            if "share" in msg and "share_text" in msg["share"]:
-                content = f"[Shared Post] {msg['share']['share_text']}"
-            else:
-                continue
-
-        # Handle 'Blocked' or 'Unsent' flags if necessary (ignoring for now)
-        
-        # Convert timestamp
-        # Instagram uses milliseconds
-        dt = datetime.fromtimestamp(ts_ms / 1000.0)
-        
-        # Instagram text decoding might be needed for utf-8 (sometimes it's latin-1 encoded in json string)
-        # But Python's json usually handles utf-8. 
-        # Known legacy FB/Insta issue: Text is often latin-1 encoded bytes showing as escaped unicode.
-        # Fix for mojibake:
-        try:
-            content = content.encode('latin1').decode('utf-8')
-            sender = sender.encode('latin1').decode('utf-8')
-        except (UnicodeEncodeError, UnicodeDecodeError):
-            pass # Keep original if fix fails
 
-        messages.append(UnifiedMessage(
-            timestamp=dt,
-            platform="Instagram",
-            sender=sender,
-            content=content
-        ))
-        
+    # Sniff the raw bytes once; clean exports skip every per-message
+    # encode/decode round trip below.
+    if ijson is not None:
+        needs_mojibake_fix = _sniff_mojibake(file_path)
+        source = open(file_path, 'rb')
+        msg_iter = ijson.items(source, 'messages.item')
+    else:
+        raw = file_path.read_bytes()
+        needs_mojibake_fix = any(marker in raw for marker in _MOJIBAKE_MARKERS)
+        source = None
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        msg_iter = data.get("messages", [])
+
+    # Hoisted bound method: one attribute lookup instead of one per message.
+    append = messages.append
+
+    try:
+        for msg in msg_iter:
+            sender = msg.get("sender_name")
+            ts_ms = msg.get("timestamp_ms")
+            content = msg.get("content")
+
+            # Skip messages without text content (e.g., pure media sends without caption)
+            # Note: 'share' key exists for shared posts, might want to capture description
+            if not content:
+                if "share" in msg and "share_text" in msg["share"]:
+                    content = f"[Shared Post] {msg['share']['share_text']}"
+                else:
+                    continue
+
+            # Handle 'Blocked' or 'Unsent' flags if necessary (ignoring for now)
+
+            # Known legacy FB/Insta issue: text is often latin-1 encoded bytes
+            # showing as escaped unicode. Only touched when the file-level sniff
+            # found mojibake, and only for strings with non-ASCII characters.
+            if needs_mojibake_fix:
+                if not content.isascii():
+                    content = _fix_mojibake(content)
+                if not sender.isascii():
+                    sender = _fix_mojibake(sender)
+
+            append(UnifiedMessage(
+                # Instagram uses millisecond timestamps; conversion is memoized
+                timestamp=_ig_timestamp(ts_ms),
+                platform="Instagram",
+                sender=sender,
+                content=content
+            ))
+
+    finally:
+        if source is not None:
+            source.close()
+
     # Sort by timestamp (usually Instagram export is reverse chronological)
     messages.sort(key=lambda x: x.timestamp)
     
@@ -3,6 +3,8 @@ FastAPI server for WhatsApp/Instagram chat preprocessing.
 Accepts file uploads, runs preprocessing, and returns a downloadable zip file.
 """
 import sys
+import asyncio
+import heapq
 import shutil
 import tempfile
 import zipfile
@@ -14,6 +16,15 @@ from io import BytesIO
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+
+# zipstream-ng produces the zip chunk-by-chunk as the client downloads,
+# so the archive never has to be buffered in memory; fall back to an
+# in-memory BytesIO zip when it is not installed.
+try:
+    from zipstream import ZipStream
+except ImportError:
+    ZipStream = None
 
 # Add current directory to Python path for imports
 sys.path.append(str(Path(__file__).resolve().parent))
@@ -23,19 +34,33 @@ from optimization import convert_to_optimized_format, save_optimized_json
 from analyzer import get_analysis_system_instruction
 import json
 
+# The analysis prompt is static, so build it once at import time rather
+# than on every /api/process request.
+_SYSTEM_INSTRUCTION = get_analysis_system_instruction()
+
+# orjson serializes JSON several times faster than the stdlib and emits
+# compact UTF-8 by default; fall back to stdlib json when not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Single-pass escape table for message content: newlines become literal
+# "\n", tabs become spaces (tab is the field separator).
+_CONTENT_TRANS = str.maketrans({'\n': '\\n', '\t': ' '})
+
 
 def compress_messages(messages, output_path: Path):
     """
     Compresses messages into a highly token-efficient format.
     Uses YY-MM timestamps and sender indices for minimal token usage.
     """
-    # Build sender index
-    senders = []
+    # Build sender index (setdefault is a single dict op per message;
+    # insertion order gives us the sender list for free)
     sender_map = {}
     for msg in messages:
-        if msg.sender not in sender_map:
-            sender_map[msg.sender] = len(senders)
-            senders.append(msg.sender)
+        sender_map.setdefault(msg.sender, len(sender_map))
+    senders = list(sender_map)
 
     # Create metadata line
     metadata = {
@@ -44,29 +69,47 @@ def compress_messages(messages, output_path: Path):
         "format": "YY-MM<tab>SenderIdx<tab>Content"
     }
 
-    # Build output lines
-    output_lines = [json.dumps(metadata, separators=(',', ':'), ensure_ascii=False)]
+    # Stream lines straight to a large-buffered file handle instead of
+    # collecting them in a list and joining - for big chats that pattern
+    # holds every line plus the joined string in memory at once.
+    # orjson's default output already matches compact separators with
+    # non-ASCII kept as-is, so both branches produce identical metadata.
+    if orjson is not None:
+        metadata_line = orjson.dumps(metadata).decode('utf-8')
+    else:
+        metadata_line = json.dumps(metadata, separators=(',', ':'), ensure_ascii=False)
 
-    for msg in messages:
-        # Timestamp: YY-MM (e.g., "23-09" for September 2023)
-        ts_compact = msg.timestamp.strftime("%y-%m")
-        
-        # Sender index
-        s_idx = sender_map[msg.sender]
-        
-        # Content: escape newlines for the format
-        content = msg.content.replace('\n', '\\n').replace('\t', ' ')
-        
-        # Tab-separated line
-        line = f"{ts_compact}\t{s_idx}\t{content}"
-        output_lines.append(line)
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(metadata_line)
+
+        for msg in messages:
+            # Timestamp: YY-MM (e.g., "23-09" for September 2023).
+            # Formatting the integer attributes directly is much cheaper
+            # than strftime, which re-parses its format string per call.
+            ts = msg.timestamp
+
+            # Sender index
+            s_idx = sender_map[msg.sender]
+
+            # Content: escape newlines for the format (one translate pass
+            # instead of two chained replace scans)
+            content = msg.content.translate(_CONTENT_TRANS)
+
+            # Tab-separated line
+            f.write(f"\n{ts.year % 100:02d}-{ts.month:02d}\t{s_idx}\t{content}")
 
-    # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(output_lines))
-    
     return output_path
 
+def _save_upload(upload: UploadFile, dest: Path):
+    """
+    Streams an uploaded file to disk in 1MB chunks, so peak memory stays
+    bounded no matter how large the export is. Blocking, so callers run
+    it in a thread.
+    """
+    with open(dest, 'wb') as f:
+        shutil.copyfileobj(upload.file, f, length=1 << 20)
+
+
 # Configure Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -127,152 +170,184 @@ async def process_chats(
             detail="Instagram file must be a .json file"
         )
     
-    # Create temporary directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
+    # Create temporary directory for processing. Managed manually (not as
+    # a context) because the streamed zip path reads files from it after
+    # this handler returns; cleanup happens when the response finishes.
+    temp_dir = tempfile.mkdtemp()
+    temp_path = Path(temp_dir)
+
+    try:
+        # Save uploaded WhatsApp file (streamed off the event loop;
+        # reading the whole upload into memory first doubled peak RSS)
+        whatsapp_path = temp_path / whatsapp_file.filename
+        await asyncio.to_thread(_save_upload, whatsapp_file, whatsapp_path)
+        logger.info(f"Saved WhatsApp file: {whatsapp_path}")
+
+        # Save uploaded Instagram file if provided
+        instagram_path = None
+        if instagram_file:
+            instagram_path = temp_path / instagram_file.filename
+            await asyncio.to_thread(_save_upload, instagram_file, instagram_path)
+            logger.info(f"Saved Instagram file: {instagram_path}")
         
-        try:
-            # Save uploaded WhatsApp file
-            whatsapp_path = temp_path / whatsapp_file.filename
-            with open(whatsapp_path, 'wb') as f:
-                content = await whatsapp_file.read()
-                f.write(content)
-            logger.info(f"Saved WhatsApp file: {whatsapp_path}")
-            
-            # Save uploaded Instagram file if provided
-            instagram_path = None
-            if instagram_file:
-                instagram_path = temp_path / instagram_file.filename
-                with open(instagram_path, 'wb') as f:
-                    content = await instagram_file.read()
-                    f.write(content)
-                logger.info(f"Saved Instagram file: {instagram_path}")
-            
-            # --- Dynamic Output Setup ---
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            
-            # Identify Chat Name for Slug
-            chat_slug = "unknown_chat"
-            person_name = "Unknown"
-            
-            if whatsapp_path.exists():
-                chat_slug = whatsapp_path.stem.replace(" ", "_").replace(".", "")
-                if "WhatsApp Chat with " in whatsapp_path.stem:
-                    person_name = whatsapp_path.stem.replace("WhatsApp Chat with ", "").strip()
-            
-            # Create output directory structure
-            run_dir = temp_path / f"{timestamp}__{chat_slug}"
-            run_dir.mkdir(parents=True, exist_ok=True)
-            
-            original_chats_dir = run_dir / "original_chats"
-            processed_data_dir = run_dir / "processed_data"
-            prompts_dir = run_dir / "prompts"
-            
-            original_chats_dir.mkdir(exist_ok=True)
-            processed_data_dir.mkdir(exist_ok=True)
-            prompts_dir.mkdir(exist_ok=True)
-            
-            logger.info(f"Created output directory: {run_dir}")
-            
-            # Copy original files
-            shutil.copy2(whatsapp_path, original_chats_dir / whatsapp_path.name)
-            
-            if instagram_path and instagram_path.exists():
-                safe_person_name = person_name.replace(" ", "_").replace(".", "")
-                new_filename = f"Instagram_Chat_with_{safe_person_name}.json"
-                shutil.copy2(instagram_path, original_chats_dir / new_filename)
-            
-            # --- Ingestion ---
-            logger.info("Starting Data Ingestion...")
-            all_messages = []
-            
-            # Parse WhatsApp
-            if whatsapp_path.exists():
-                logger.info(f"Parsing WhatsApp: {whatsapp_path}")
-                wa_msgs = parse_whatsapp(whatsapp_path)
-                all_messages.extend(wa_msgs)
-                logger.info(f"Parsed {len(wa_msgs)} WhatsApp messages")
-            
-            # Parse Instagram
-            if instagram_path and instagram_path.exists():
-                logger.info(f"Parsing Instagram: {instagram_path}")
-                ig_msgs = parse_instagram(instagram_path)
-                all_messages.extend(ig_msgs)
-                logger.info(f"Parsed {len(ig_msgs)} Instagram messages")
-            
-            if not all_messages:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No messages found in the uploaded files. Please check the file format."
-                )
-            
-            # Sort messages by timestamp
-            all_messages.sort(key=lambda x: x.timestamp)
-            logger.info(f"Total messages loaded: {len(all_messages)}")
-            
-            # Convert to optimized format
-            logger.info("Converting to optimized format...")
-            optimized_data = convert_to_optimized_format(all_messages)
-            
-            # Save optimized JSON
-            processed_data_path = processed_data_dir / f"processed_{chat_slug}.json"
-            saved_paths = save_optimized_json(optimized_data, processed_data_path)
-            for path in saved_paths:
-                logger.info(f"Saved optimized chunk: {path}")
-            
-            # Save system instruction prompt
-            system_instruction = get_analysis_system_instruction()
-            prompt_file = prompts_dir / "system_instruction.txt"
-            with open(prompt_file, "w", encoding="utf-8") as f:
-                f.write(system_instruction)
-            logger.info(f"Saved system instruction to: {prompt_file}")
-            
-            # --- Compression (if enabled) ---
-            if enable_compression:
-                logger.info("Compression enabled - creating compressed version...")
-                compressed_data_dir = run_dir / "compressed_data"
-                compressed_data_dir.mkdir(exist_ok=True)
-                
-                compressed_file_path = compressed_data_dir / f"compressed_{chat_slug}.txt"
-                compress_messages(all_messages, compressed_file_path)
-                logger.info(f"Saved compressed chat to: {compressed_file_path}")
-            
-            # --- Create Zip File ---
-            logger.info("Creating zip file...")
-            zip_buffer = BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Add all files from run_dir
-                for file_path in run_dir.rglob('*'):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(run_dir)
-                        zip_file.write(file_path, arcname)
-                        logger.info(f"Added to zip: {arcname}")
-            
-            zip_buffer.seek(0)
-            
-            # Generate download filename
-            download_filename = f"{timestamp}__{chat_slug}.zip"
-            
-            logger.info(f"Zip file created successfully: {download_filename}")
+        # --- Dynamic Output Setup ---
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        
+        # Identify Chat Name for Slug
+        chat_slug = "unknown_chat"
+        person_name = "Unknown"
+        
+        if whatsapp_path.exists():
+            chat_slug = whatsapp_path.stem.replace(" ", "_").replace(".", "")
+            if "WhatsApp Chat with " in whatsapp_path.stem:
+                person_name = whatsapp_path.stem.replace("WhatsApp Chat with ", "").strip()
+        
+        # Create output directory structure
+        run_dir = temp_path / f"{timestamp}__{chat_slug}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+        
+        original_chats_dir = run_dir / "original_chats"
+        processed_data_dir = run_dir / "processed_data"
+        prompts_dir = run_dir / "prompts"
+        
+        original_chats_dir.mkdir(exist_ok=True)
+        processed_data_dir.mkdir(exist_ok=True)
+        prompts_dir.mkdir(exist_ok=True)
+        
+        logger.info(f"Created output directory: {run_dir}")
+        
+        # Copy original files
+        shutil.copy2(whatsapp_path, original_chats_dir / whatsapp_path.name)
+        
+        if instagram_path and instagram_path.exists():
+            safe_person_name = person_name.replace(" ", "_").replace(".", "")
+            new_filename = f"Instagram_Chat_with_{safe_person_name}.json"
+            shutil.copy2(instagram_path, original_chats_dir / new_filename)
+        
+        # --- Ingestion ---
+        # Parsing is CPU-bound and the two sources are independent, so
+        # both run in worker threads and overlap; the event loop stays
+        # free for health checks meanwhile.
+        logger.info("Starting Data Ingestion...")
+
+        parse_jobs = []
+        if whatsapp_path.exists():
+            logger.info(f"Parsing WhatsApp: {whatsapp_path}")
+            parse_jobs.append(("WhatsApp", asyncio.to_thread(parse_whatsapp, whatsapp_path)))
+
+        if instagram_path and instagram_path.exists():
+            logger.info(f"Parsing Instagram: {instagram_path}")
+            parse_jobs.append(("Instagram", asyncio.to_thread(parse_instagram, instagram_path)))
+
+        results = await asyncio.gather(*(job for _, job in parse_jobs))
+        for (platform, _), msgs in zip(parse_jobs, results):
+            logger.info(f"Parsed {len(msgs)} {platform} messages")
+
+        # Each parser already returns messages sorted by timestamp, so the
+        # streams are merged in O(n) instead of re-sorted in O(n log n).
+        all_messages = list(heapq.merge(*results, key=lambda x: x.timestamp))
+
+        if not all_messages:
+            raise HTTPException(
+                status_code=400,
+                detail="No messages found in the uploaded files. Please check the file format."
+            )
+
+        logger.info(f"Total messages loaded: {len(all_messages)}")
+        
+        # Convert to optimized format
+        logger.info("Converting to optimized format...")
+        optimized_data = convert_to_optimized_format(all_messages)
+        
+        # Save optimized JSON
+        processed_data_path = processed_data_dir / f"processed_{chat_slug}.json"
+        saved_paths = save_optimized_json(optimized_data, processed_data_path)
+        for path in saved_paths:
+            logger.info(f"Saved optimized chunk: {path}")
+        
+        # Save system instruction prompt
+        prompt_file = prompts_dir / "system_instruction.txt"
+        with open(prompt_file, "w", encoding="utf-8") as f:
+            f.write(_SYSTEM_INSTRUCTION)
+        logger.info(f"Saved system instruction to: {prompt_file}")
+        
+        # --- Compression (if enabled) ---
+        if enable_compression:
+            logger.info("Compression enabled - creating compressed version...")
+            compressed_data_dir = run_dir / "compressed_data"
+            compressed_data_dir.mkdir(exist_ok=True)
             
+            compressed_file_path = compressed_data_dir / f"compressed_{chat_slug}.txt"
+            compress_messages(all_messages, compressed_file_path)
+            logger.info(f"Saved compressed chat to: {compressed_file_path}")
+        
+        # --- Create Zip File ---
+        logger.info("Creating zip file...")
+
+        # Generate download filename
+        download_filename = f"{timestamp}__{chat_slug}.zip"
+        headers = {
+            "Content-Disposition": f"attachment; filename={download_filename}"
+        }
+
+        if ZipStream is not None:
+            # Compress chunk-by-chunk as the client downloads; the temp
+            # dir is removed once the response has finished streaming.
+            # Unsized on purpose: a sized ZipStream forbids compression,
+            # and nothing here needs the length up front.
+            zs = ZipStream(compress_type=zipfile.ZIP_DEFLATED)
+            added = []
+            for file_path in run_dir.rglob('*'):
+                if file_path.is_file():
+                    arcname = file_path.relative_to(run_dir)
+                    zs.add_path(str(file_path), str(arcname))
+                    added.append(str(arcname))
+
+            logger.info("Added %d files to zip: %s", len(added), added)
+            logger.info(f"Streaming zip: {download_filename}")
             return StreamingResponse(
-                zip_buffer,
+                zs,
                 media_type="application/zip",
-                headers={
-                    "Content-Disposition": f"attachment; filename={download_filename}"
-                }
-            )
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Error processing files: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error processing files: {str(e)}"
+                headers=headers,
+                background=BackgroundTask(shutil.rmtree, temp_dir, ignore_errors=True)
             )
 
+        # Fallback: build the whole zip in memory
+        zip_buffer = BytesIO()
+
+        added = []
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            # Add all files from run_dir
+            for file_path in run_dir.rglob('*'):
+                if file_path.is_file():
+                    arcname = file_path.relative_to(run_dir)
+                    zip_file.write(file_path, arcname)
+                    added.append(str(arcname))
+
+        logger.info("Added %d files to zip: %s", len(added), added)
+
+        zip_buffer.seek(0)
+
+        logger.info(f"Zip file created successfully: {download_filename}")
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return StreamingResponse(
+            zip_buffer,
+            media_type="application/zip",
+            headers=headers
+        )
+
+    except HTTPException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.error(f"Error processing files: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing files: {str(e)}"
+        )
+
 
 if __name__ == "__main__":
     import uvicorn
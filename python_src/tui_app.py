@@ -3,13 +3,23 @@ Chat Analyzer TUI - A beautiful Terminal User Interface
 Built with Textual and Rich for the WhatsApp/Instagram Chat Analyzer
 """
 
+import os
 import sys
 import asyncio
+from dataclasses import asdict
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import attrgetter
+import heapq
 import json
+import queue
 import shutil
+import subprocess
+import threading
+import time
+import traceback
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).resolve().parent))
@@ -30,10 +40,65 @@ from textual.worker import Worker, get_current_worker
 from rich.console import Console
 from rich.text import Text
 
-# Import project modules
+# orjson serializes JSON several times faster than the stdlib and writes
+# raw bytes; fall back to stdlib json when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Import project modules. Importing analyzer/optimization here (not
+# inside run_analysis) makes the heavy google-genai import a one-time
+# startup cost masked by the welcome screen, instead of a visible stall
+# the first time an analysis runs.
 from config import WHATSAPP_PATH, INSTAGRAM_PATH, OUTPUT_DIR, GEMINI_ACCOUNT_KEYS, BASE_DIR
 from parsers import parse_whatsapp, parse_instagram
 from models import UnifiedMessage
+from optimization import convert_to_optimized_format, save_optimized_json
+from analyzer import (
+    chunk_messages, analyze_chunk, aggregate_profiles,
+    generate_gift_recommendations, generate_relationship_report,
+    get_analysis_system_instruction
+)
+
+
+# Slug sanitization in one translate pass; also strips path separators
+# and colons so a crafted filename can't escape the output directory.
+_SLUG_TABLE = str.maketrans({' ': '_', '.': '', '/': '_', '\\': '_', ':': '_'})
+
+# Files tab shows at most this many entries; runs with thousands of
+# per-chunk artifacts would otherwise make the render cost unbounded.
+_MAX_LISTED_FILES = 500
+
+# Log level icons, bound once instead of rebuilding a dict per log line
+_LOG_ICONS = {
+    "info": "ℹ️",
+    "success": "✅",
+    "warning": "⚠️",
+    "error": "❌",
+    "progress": "→",
+}
+
+
+def _open_folder(path: str) -> None:
+    """
+    Opens `path` in the platform's file manager. os.startfile only exists
+    on Windows; macOS and Linux go through open/xdg-open.
+    """
+    if sys.platform == "win32":
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", path])
+    else:
+        subprocess.Popen(["xdg-open", path])
+
+
+def _open_folder_async(path) -> None:
+    """
+    Launches _open_folder on a daemon thread so a slow file-manager spawn
+    (networked drives, cold Explorer) never stalls the UI thread.
+    """
+    threading.Thread(target=_open_folder, args=(str(path),), daemon=True).start()
 
 
 # ============================================================================
@@ -297,13 +362,20 @@ class SettingsScreen(Screen):
             self.save_settings()
             self.app.push_screen(ProcessingScreen())
     
+    def on_mount(self) -> None:
+        """Cache widget references once instead of a DOM walk per save."""
+        self._sw_ai = self.query_one("#switch-use-ai", Switch)
+        self._sw_skip = self.query_one("#switch-skip-analysis", Switch)
+        self._sw_dry = self.query_one("#switch-dry-run", Switch)
+        self._input_limit = self.query_one("#input-limit", Input)
+
     def save_settings(self) -> None:
         """Save current settings to app state."""
-        self.app.use_ai = self.query_one("#switch-use-ai", Switch).value
-        self.app.skip_analysis = self.query_one("#switch-skip-analysis", Switch).value
-        self.app.dry_run = self.query_one("#switch-dry-run", Switch).value
-        
-        limit_input = self.query_one("#input-limit", Input).value
+        self.app.use_ai = self._sw_ai.value
+        self.app.skip_analysis = self._sw_skip.value
+        self.app.dry_run = self._sw_dry.value
+
+        limit_input = self._input_limit.value
         try:
             self.app.message_limit = int(limit_input) if limit_input else 0
         except ValueError:
@@ -325,6 +397,14 @@ class ProcessingScreen(Screen):
         super().__init__(**kwargs)
         self._processing = False
         self.current_worker: Optional[Worker] = None
+        # Worker thread pushes UI updates here; a single interval timer on
+        # the UI thread drains them in batches. One cross-thread hop per
+        # 100ms instead of one per log line / progress tick.
+        self._ui_queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Only the latest progress matters, so it overwrites a slot
+        # instead of queueing.
+        self._pending_progress: Optional[tuple] = None
+        self._nav_timer = None
     
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -340,7 +420,10 @@ class ProcessingScreen(Screen):
             # Log container
             with Vertical(id="log-container"):
                 yield Static("📋 Task Log", id="log-title")
-                yield Log(id="task-log", highlight=True, auto_scroll=True)
+                # max_lines bounds the log to a ring buffer: long AI runs
+                # emit thousands of lines, and without a cap both memory
+                # and per-write layout cost grow with the whole history.
+                yield Log(id="task-log", max_lines=500, highlight=True, auto_scroll=True)
             
             # Action buttons
             with Horizontal(id="processing-actions"):
@@ -350,29 +433,60 @@ class ProcessingScreen(Screen):
     
     def on_mount(self) -> None:
         """Start processing when screen is mounted."""
+        # Cache widget references once; the drain timer fires ten times a
+        # second and would otherwise walk the DOM four times per tick.
+        self._log = self.query_one("#task-log", Log)
+        self._progress_bar = self.query_one("#progress-bar", ProgressBar)
+        self._current_task = self.query_one("#current-task", Static)
+        self._progress_stats = self.query_one("#progress-stats", Static)
+
+        self.set_interval(0.1, self._drain_ui_queue)
         self.run_analysis()
-    
+
+    def _drain_ui_queue(self) -> None:
+        """Applies queued log lines and the latest progress (UI thread)."""
+        lines = []
+        try:
+            while True:
+                lines.append(self._ui_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lines:
+            self._log.write_lines(lines)
+
+        progress = self._pending_progress
+        if progress is not None:
+            self._pending_progress = None
+            value, total, status = progress
+            self._progress_bar.update(progress=value)
+            self._current_task.update(status)
+            self._progress_stats.update(f"{value:,} / {total:,}")
+
     @work(exclusive=True, thread=True)
     def run_analysis(self) -> None:
         """Run the analysis in a background thread."""
         worker = get_current_worker()
-        log = self.query_one("#task-log", Log)
-        progress_bar = self.query_one("#progress-bar", ProgressBar)
-        current_task = self.query_one("#current-task", Static)
-        progress_stats = self.query_one("#progress-stats", Static)
-        
+
+        # Adjacent log lines almost always share a wall-clock second, so
+        # the HH:MM:SS prefix is formatted once per second, not per line.
+        last_ts_second = 0
+        last_ts_str = ""
+
         def update_log(message: str, level: str = "info"):
-            """Thread-safe log update."""
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            icons = {"info": "ℹ️", "success": "✅", "warning": "⚠️", "error": "❌", "progress": "→"}
-            icon = icons.get(level, "ℹ️")
-            self.app.call_from_thread(log.write_line, f"[{timestamp}] {icon} {message}")
-        
+            """Thread-safe log update (queued, drained on the UI thread)."""
+            nonlocal last_ts_second, last_ts_str
+            now = time.time()
+            sec = int(now)
+            if sec != last_ts_second:
+                last_ts_str = time.strftime("%H:%M:%S", time.localtime(now))
+                last_ts_second = sec
+            icon = _LOG_ICONS.get(level, "ℹ️")
+            self._ui_queue.put_nowait(f"[{last_ts_str}] {icon} {message}")
+
         def update_progress(value: int, total: int, status: str):
-            """Thread-safe progress update."""
-            self.app.call_from_thread(progress_bar.update, progress=value)
-            self.app.call_from_thread(current_task.update, status)
-            self.app.call_from_thread(progress_stats.update, f"{value:,} / {total:,}")
+            """Thread-safe progress update (latest value wins)."""
+            self._pending_progress = (value, total, status)
         
         try:
             update_log("Starting analysis pipeline...", "info")
@@ -381,43 +495,49 @@ class ProcessingScreen(Screen):
             wa_file = getattr(self.app, 'whatsapp_file', None) or WHATSAPP_PATH
             ig_file = getattr(self.app, 'instagram_file', None) or INSTAGRAM_PATH
             
-            all_messages = []
-            
-            # Parse WhatsApp
-            if wa_file and Path(wa_file).exists():
-                update_log(f"Parsing WhatsApp: {Path(wa_file).name}", "progress")
-                update_progress(10, 100, "Parsing WhatsApp messages...")
-                
-                wa_msgs = parse_whatsapp(Path(wa_file))
-                all_messages.extend(wa_msgs)
-                
-                update_log(f"Found {len(wa_msgs):,} WhatsApp messages", "success")
-            else:
+            wa_path = Path(wa_file) if wa_file and Path(wa_file).exists() else None
+            ig_path = Path(ig_file) if ig_file and Path(ig_file).exists() else None
+
+            if wa_path is None:
                 update_log("No WhatsApp file found", "warning")
-            
+            if ig_path is None:
+                update_log("No Instagram file found", "warning")
+
+            # Parse both exports concurrently: they are distinct files,
+            # so the disk reads and parsing overlap instead of running
+            # back to back.
+            update_progress(10, 100, "Parsing chat exports...")
+            wa_msgs: List[UnifiedMessage] = []
+            ig_msgs: List[UnifiedMessage] = []
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                wa_future = executor.submit(parse_whatsapp, wa_path) if wa_path else None
+                ig_future = executor.submit(parse_instagram, ig_path) if ig_path else None
+
+                if wa_future is not None:
+                    update_log(f"Parsing WhatsApp: {wa_path.name}", "progress")
+                    wa_msgs = wa_future.result()
+                    update_log(f"Found {len(wa_msgs):,} WhatsApp messages", "success")
+
+                if ig_future is not None:
+                    update_log(f"Parsing Instagram: {ig_path.name}", "progress")
+                    update_progress(25, 100, "Parsing Instagram messages...")
+                    ig_msgs = ig_future.result()
+                    update_log(f"Found {len(ig_msgs):,} Instagram messages", "success")
+
             if worker.is_cancelled:
                 update_log("Analysis cancelled by user", "warning")
                 return
-            
-            # Parse Instagram
-            if ig_file and Path(ig_file).exists():
-                update_log(f"Parsing Instagram: {Path(ig_file).name}", "progress")
-                update_progress(25, 100, "Parsing Instagram messages...")
-                
-                ig_msgs = parse_instagram(Path(ig_file))
-                all_messages.extend(ig_msgs)
-                
-                update_log(f"Found {len(ig_msgs):,} Instagram messages", "success")
-            else:
-                update_log("No Instagram file found", "warning")
-            
-            if not all_messages:
+
+            if not wa_msgs and not ig_msgs:
                 update_log("No messages found from any source!", "error")
                 return
-            
-            # Sort messages
+
+            # Both parsers emit chronologically ordered messages (exports
+            # are time-ordered; parse_instagram sorts), so an O(n) merge
+            # replaces the O(n log n) sort of the concatenated list.
             update_progress(40, 100, "Sorting and processing messages...")
-            all_messages.sort(key=lambda x: x.timestamp)
+            all_messages = list(heapq.merge(wa_msgs, ig_msgs, key=attrgetter('timestamp')))
             total_msgs = len(all_messages)
             update_log(f"Total messages loaded: {total_msgs:,}", "success")
             
@@ -431,7 +551,7 @@ class ProcessingScreen(Screen):
             chat_slug = "chat_analysis"
             
             if wa_file and Path(wa_file).exists():
-                chat_slug = Path(wa_file).stem.replace(" ", "_").replace(".", "")
+                chat_slug = Path(wa_file).stem.translate(_SLUG_TABLE)
             
             run_dir = OUTPUT_DIR / f"{timestamp}__{chat_slug}"
             run_dir.mkdir(parents=True, exist_ok=True)
@@ -447,9 +567,7 @@ class ProcessingScreen(Screen):
             # Convert to optimized format
             update_progress(60, 100, "Converting to optimized format...")
             update_log("Converting to optimized Toon format...", "progress")
-            
-            from optimization import convert_to_optimized_format, save_optimized_json
-            
+
             optimized_data = convert_to_optimized_format(all_messages)
             processed_path = processed_dir / f"processed_{chat_slug}.json"
             saved_paths = save_optimized_json(optimized_data, processed_path)
@@ -475,48 +593,60 @@ class ProcessingScreen(Screen):
                 
                 prompts_dir = run_dir / "prompts"
                 prompts_dir.mkdir(exist_ok=True)
-                
-                from analyzer import get_analysis_system_instruction
-                
+
                 system_instruction = get_analysis_system_instruction()
                 prompt_file = prompts_dir / "system_instruction.txt"
-                
-                with open(prompt_file, "w", encoding="utf-8") as f:
-                    f.write(system_instruction)
-                
+                prompt_file.write_text(system_instruction, encoding="utf-8")
+
                 update_log(f"Saved system instruction: {prompt_file.name}", "success")
                 update_progress(100, 100, "Prompt generation complete!")
             else:
                 # Full AI analysis
                 update_progress(70, 100, "Running AI analysis...")
                 update_log("Starting Gemini API analysis...", "progress")
-                
-                # Import analysis functions
-                from analyzer import (
-                    chunk_messages, analyze_chunk, aggregate_profiles,
-                    generate_gift_recommendations, generate_relationship_report
-                )
-                
-                # Chunk messages
+
+                # Chunk messages. With no limit the full list is passed
+                # through untouched (no defensive copy); with a limit the
+                # tail slice is one pointer-array copy of at most
+                # msg_limit references, which chunk_messages needs as a
+                # real sequence for its range slicing.
                 msg_limit = getattr(self.app, 'message_limit', 0)
                 msgs_to_analyze = all_messages[-msg_limit:] if msg_limit > 0 else all_messages
                 
                 chunks = chunk_messages(msgs_to_analyze, chunk_size=300)
                 update_log(f"Created {len(chunks)} chunks for analysis", "info")
                 
-                # Analyze chunks
-                chunk_results = []
-                for i, chunk in enumerate(chunks):
-                    if worker.is_cancelled:
-                        return
-                    
-                    progress = 70 + int((i / len(chunks)) * 20)
-                    update_progress(progress, 100, f"Analyzing chunk {i+1}/{len(chunks)}...")
-                    update_log(f"Processing chunk {i+1}/{len(chunks)}...", "progress")
-                    
-                    result = analyze_chunk(i, chunk)
-                    if result:
-                        chunk_results.append(result)
+                # Analyze chunks concurrently: each analyze_chunk call
+                # blocks on a Gemini RPC, so overlapping them collapses
+                # wall time toward (chunks / workers) round trips. Worker
+                # count is bounded by the key count to respect per-key
+                # rate limits.
+                total_chunks = len(chunks)
+                max_workers = min(8, 2 * len(GEMINI_ACCOUNT_KEYS)) if GEMINI_ACCOUNT_KEYS else 4
+                results_by_index = [None] * total_chunks
+                completed = 0
+
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(analyze_chunk, i, chunk): i
+                        for i, chunk in enumerate(chunks)
+                    }
+                    for future in as_completed(futures):
+                        if worker.is_cancelled:
+                            executor.shutdown(cancel_futures=True)
+                            return
+
+                        i = futures[future]
+                        results_by_index[i] = future.result()
+                        completed += 1
+
+                        progress = 70 + int((completed / total_chunks) * 20)
+                        update_progress(progress, 100, f"Analyzed chunk {completed}/{total_chunks}...")
+                        update_log(f"Chunk {i+1}/{total_chunks} analyzed", "progress")
+
+                # Completion order varied; index order and None-filtering
+                # keep the aggregation input chronological.
+                chunk_results = [r for r in results_by_index if r]
                 
                 # Aggregate and generate reports
                 update_progress(90, 100, "Generating reports...")
@@ -524,31 +654,41 @@ class ProcessingScreen(Screen):
                 
                 memory_map = aggregate_profiles(chunk_results)
                 
-                # Save memory map
+                # Save memory map. json.dump streams straight to the file
+                # instead of materializing the whole payload as a string
+                # first; orjson serializes in C when available.
                 memory_map_path = processed_dir / f"memory_map_{chat_slug}.json"
-                with open(memory_map_path, 'w', encoding='utf-8') as f:
-                    f.write(json.dumps(memory_map.__dict__, indent=2, ensure_ascii=False))
+                memory_map_dict = asdict(memory_map)
+                if orjson is not None:
+                    memory_map_path.write_bytes(
+                        orjson.dumps(memory_map_dict, option=orjson.OPT_INDENT_2)
+                    )
+                else:
+                    with open(memory_map_path, 'w', encoding='utf-8') as f:
+                        json.dump(memory_map_dict, f, indent=2, ensure_ascii=False)
                 update_log("Memory map saved", "success")
                 
                 # Generate recommendations
                 reports_dir = run_dir / "reports"
                 reports_dir.mkdir(exist_ok=True)
                 
+                # Both report generations are independent Gemini RPCs, so
+                # they run overlapped; the stage takes one round trip
+                # instead of two.
                 update_log("Generating gift recommendations...", "progress")
-                recommendations = generate_gift_recommendations(memory_map)
-                
+                update_log("Generating relationship report...", "progress")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    rec_future = executor.submit(generate_gift_recommendations, memory_map)
+                    rel_future = executor.submit(generate_relationship_report, memory_map)
+                    recommendations = rec_future.result()
+                    relationship_report = rel_future.result()
+
                 rec_path = reports_dir / f"recommendations_{chat_slug}.md"
-                with open(rec_path, 'w', encoding='utf-8') as f:
-                    f.write(recommendations)
+                rec_path.write_text(recommendations, encoding='utf-8')
                 update_log("Gift recommendations saved", "success")
-                
-                # Generate relationship report
-                update_log("Generating relationship report...", "progress")
-                relationship_report = generate_relationship_report(memory_map)
-                
+
                 rel_path = reports_dir / f"relationship_report_{chat_slug}.md"
-                with open(rel_path, 'w', encoding='utf-8') as f:
-                    f.write(relationship_report)
+                rel_path.write_text(relationship_report, encoding='utf-8')
                 update_log("Relationship report saved", "success")
                 
                 update_progress(100, 100, "Analysis complete!")
@@ -561,25 +701,32 @@ class ProcessingScreen(Screen):
             update_log("✨ All tasks completed successfully!", "success")
             update_log(f"Output saved to: {run_dir}", "info")
             
-            # Auto-navigate to results after a delay
-            import time
-            time.sleep(2)
-            
+            # Auto-navigate to results after a short, cancellable delay.
+            # A Textual timer replaces the old time.sleep(2), which held
+            # the worker thread hostage and delayed cancellation by up to
+            # two seconds.
             if not worker.is_cancelled:
-                self.app.call_from_thread(self.app.push_screen, ResultsScreen())
-            
+                self.app.call_from_thread(self._schedule_navigation)
+
         except Exception as e:
             update_log(f"Error: {str(e)}", "error")
-            import traceback
             update_log(traceback.format_exc(), "error")
     
+    def _schedule_navigation(self) -> None:
+        """Schedules the jump to the results screen (UI thread)."""
+        self._nav_timer = self.set_timer(
+            2.0, lambda: self.app.push_screen(ResultsScreen())
+        )
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
         if event.button.id == "btn-cancel":
             self.action_cancel_processing()
-    
+
     def action_cancel_processing(self) -> None:
         """Cancel the current processing."""
+        if self._nav_timer is not None:
+            self._nav_timer.stop()
         workers = self.workers
         for worker in workers:
             worker.cancel()
@@ -598,10 +745,43 @@ class ResultsScreen(Screen):
         Binding("escape", "go_home", "Back"),
         Binding("h", "go_home", "Home"),
     ]
-    
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._report_paths: Optional[dict] = None
+
+    def _scan_reports(self) -> dict:
+        """
+        Scans the run's reports/prompts directories once and caches the
+        interesting paths; the per-tab loaders used to glob the same tree
+        three separate times during compose.
+        """
+        if self._report_paths is not None:
+            return self._report_paths
+
+        paths = {}
+        run_dir = getattr(self.app, 'last_run_dir', None)
+        if run_dir:
+            reports_dir = run_dir / "reports"
+            if reports_dir.is_dir():
+                for entry in os.scandir(reports_dir):
+                    if entry.name.startswith("recommendations_") and entry.name.endswith(".md"):
+                        paths["recommendations"] = Path(entry.path)
+                    elif entry.name.startswith("relationship_report_") and entry.name.endswith(".md"):
+                        paths["relationship"] = Path(entry.path)
+
+            prompts_dir = run_dir / "prompts"
+            if prompts_dir.is_dir():
+                for entry in os.scandir(prompts_dir):
+                    if entry.name.endswith(".txt"):
+                        paths.setdefault("prompt", Path(entry.path))
+
+        self._report_paths = paths
+        return paths
+
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
-        
+
         with Vertical(id="results-main"):
             # Summary box
             with Vertical(id="summary-box"):
@@ -613,16 +793,22 @@ class ResultsScreen(Screen):
                 yield Static(f"  📂 Output: {run_dir.name if run_dir else 'N/A'}")
                 yield Static(f"  💬 Messages: {msg_count:,}")
             
-            # Results tabs
+            # Results tabs. Reports render as Markdown inside scroll
+            # containers (the HelpScreen pattern): a single huge Static
+            # lays out the whole document at once and hitches tab
+            # switches on large reports.
             with TabbedContent(id="results-tabs"):
                 with TabPane("🎁 Gifts", id="tab-gifts"):
-                    yield Static(self._load_recommendations(), id="gifts-content")
-                
+                    with ScrollableContainer(id="gifts-scroll"):
+                        yield Markdown(self._load_recommendations(), id="gifts-content")
+
                 with TabPane("💖 Relationship", id="tab-relationship"):
-                    yield Static(self._load_relationship_report(), id="relationship-content")
-                
+                    with ScrollableContainer(id="relationship-scroll"):
+                        yield Markdown(self._load_relationship_report(), id="relationship-content")
+
                 with TabPane("📂 Files", id="tab-files"):
-                    yield Static(self._list_output_files(), id="files-content")
+                    with ScrollableContainer(id="files-scroll"):
+                        yield Static(self._list_output_files(), id="files-content")
             
             # Action buttons
             with Horizontal(id="results-actions"):
@@ -634,47 +820,57 @@ class ResultsScreen(Screen):
     
     def _load_recommendations(self) -> str:
         """Load gift recommendations from file."""
-        run_dir = getattr(self.app, 'last_run_dir', None)
-        if not run_dir:
+        if not getattr(self.app, 'last_run_dir', None):
             return "No recommendations available."
-        
-        rec_files = list((run_dir / "reports").glob("recommendations_*.md"))
-        if rec_files:
-            return rec_files[0].read_text(encoding='utf-8')
-        
-        prompt_files = list((run_dir / "prompts").glob("*.txt"))
-        if prompt_files:
-            return f"**Prompt Generated**\n\nSystem instruction saved to:\n`{prompt_files[0]}`\n\nUse this with Google AI Studio for manual analysis."
-        
+
+        paths = self._scan_reports()
+        if "recommendations" in paths:
+            return paths["recommendations"].read_text(encoding='utf-8')
+
+        if "prompt" in paths:
+            return f"**Prompt Generated**\n\nSystem instruction saved to:\n`{paths['prompt']}`\n\nUse this with Google AI Studio for manual analysis."
+
         return "No recommendations generated. Try running with AI enabled."
-    
+
     def _load_relationship_report(self) -> str:
         """Load relationship report from file."""
-        run_dir = getattr(self.app, 'last_run_dir', None)
-        if not run_dir:
+        if not getattr(self.app, 'last_run_dir', None):
             return "No relationship report available."
-        
-        rel_files = list((run_dir / "reports").glob("relationship_report_*.md"))
-        if rel_files:
-            return rel_files[0].read_text(encoding='utf-8')
-        
+
+        paths = self._scan_reports()
+        if "relationship" in paths:
+            return paths["relationship"].read_text(encoding='utf-8')
+
         return "No relationship report generated. Try running with AI enabled."
     
+    @staticmethod
+    def _walk_files(path):
+        """Yields an os.DirEntry for every file under `path`, recursively."""
+        for entry in os.scandir(path):
+            if entry.is_dir(follow_symlinks=False):
+                yield from ResultsScreen._walk_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
     def _list_output_files(self) -> str:
         """List all output files."""
         run_dir = getattr(self.app, 'last_run_dir', None)
         if not run_dir:
             return "No output files."
-        
-        lines = [f"📁 {run_dir}\n"]
-        
-        for item in sorted(run_dir.rglob("*")):
-            if item.is_file():
-                rel_path = item.relative_to(run_dir)
-                size = item.stat().st_size
-                size_str = f"{size:,} bytes" if size < 1024 else f"{size/1024:.1f} KB"
-                lines.append(f"  📄 {rel_path} ({size_str})")
-        
+
+        def _size_str(size: int) -> str:
+            return f"{size:,} bytes" if size < 1024 else f"{size/1024:.1f} KB"
+
+        # os.scandir caches each entry's stat result, so the type check
+        # and size read below cost no extra syscalls - unlike rglob +
+        # per-path is_file()/stat(), which stats everything twice.
+        entries = sorted(self._walk_files(run_dir), key=lambda e: e.path)
+        lines = [f"📁 {run_dir}\n"] + [
+            f"  📄 {os.path.relpath(entry.path, run_dir)} ({_size_str(entry.stat().st_size)})"
+            for entry in entries[:_MAX_LISTED_FILES]
+        ]
+        if len(entries) > _MAX_LISTED_FILES:
+            lines.append(f"  … and {len(entries) - _MAX_LISTED_FILES:,} more files")
         return "\n".join(lines)
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
@@ -688,8 +884,7 @@ class ResultsScreen(Screen):
         elif event.button.id == "btn-open-folder":
             run_dir = getattr(self.app, 'last_run_dir', None)
             if run_dir:
-                import os
-                os.startfile(str(run_dir))
+                _open_folder_async(run_dir)
     
     def action_go_home(self) -> None:
         """Navigate back to home."""
@@ -718,34 +913,62 @@ class PreviousResultsScreen(Screen):
         
         with Vertical(id="prev-results-container"):
             yield Static("📂 Previous Results", classes="section-title")
-            
-            # List previous runs
+
+            # Yield the table empty so the first paint is instant; a
+            # background worker fills it in after mount.
             table = DataTable(id="results-table")
             table.add_columns("Date", "Chat", "Status")
-            
-            if OUTPUT_DIR.exists():
-                for run_dir in sorted(OUTPUT_DIR.iterdir(), reverse=True):
-                    if run_dir.is_dir() and "__" in run_dir.name:
-                        parts = run_dir.name.split("__", 1)
-                        date = parts[0] if parts else "Unknown"
-                        chat = parts[1][:35] if len(parts) > 1 else "Unknown"
-                        
-                        # Check for reports
-                        has_reports = (run_dir / "reports").exists()
-                        status = "✅ Complete" if has_reports else "📝 Prompts Only"
-                        
-                        table.add_row(date, chat, status)
-                        self.run_dirs.append(run_dir)
-            
             yield table
-            
+
             # Action buttons - docked at bottom
             with Horizontal(id="prev-results-actions"):
                 yield Button("📂 Open Folder", id="btn-open", variant="primary")
                 yield Button("← Back to Home", id="btn-back", variant="default")
-        
+
         yield Footer()
-    
+
+    def on_mount(self) -> None:
+        """Kick off the directory scan once the empty table is painted."""
+        self._populate_table()
+
+    @work(exclusive=True, thread=True)
+    def _populate_table(self) -> None:
+        """Scans OUTPUT_DIR off the UI thread and posts rows in one batch."""
+        rows = []
+        run_dirs = []
+
+        if OUTPUT_DIR.exists():
+            with os.scandir(OUTPUT_DIR) as it:
+                # Newest 200 runs are plenty; an unbounded table makes
+                # this screen slower to mount with every analysis ever run.
+                candidates = sorted(
+                    (e for e in it if e.is_dir(follow_symlinks=False) and "__" in e.name),
+                    key=lambda e: e.name,
+                    reverse=True
+                )[:200]
+
+            for entry in candidates:
+                parts = entry.name.split("__", 1)
+                date = parts[0] if parts else "Unknown"
+                chat = parts[1][:35] if len(parts) > 1 else "Unknown"
+
+                # Check for reports (plain isdir: no Path object churn)
+                has_reports = os.path.isdir(os.path.join(entry.path, "reports"))
+                status = "✅ Complete" if has_reports else "📝 Prompts Only"
+
+                rows.append((date, chat, status))
+                run_dirs.append(Path(entry.path))
+
+        # One cross-thread dispatch for the whole batch, not one per row
+        self.app.call_from_thread(self._apply_rows, rows, run_dirs)
+
+    def _apply_rows(self, rows, run_dirs) -> None:
+        """Applies the scanned rows to the table (UI thread)."""
+        self.run_dirs = run_dirs
+        table = self.query_one("#results-table", DataTable)
+        for row in rows:
+            table.add_row(*row)
+
     def action_go_back(self) -> None:
         """Go back to the previous screen."""
         self.app.pop_screen()
@@ -758,8 +981,7 @@ class PreviousResultsScreen(Screen):
             table = self.query_one("#results-table", DataTable)
             if table.cursor_row is not None and table.cursor_row < len(self.run_dirs):
                 run_dir = self.run_dirs[table.cursor_row]
-                import os
-                os.startfile(str(run_dir))
+                _open_folder_async(run_dir)
                 self.notify(f"Opened: {run_dir.name}", severity="information")
             else:
                 self.notify("Select a row first", severity="warning")